@@ -1,10 +1,25 @@
 import os
+import sys
 import tkinter as tk
-from tkinter import filedialog, messagebox, scrolledtext, ttk
+from tkinter import filedialog, messagebox, scrolledtext, simpledialog, ttk
 import re
 from datetime import datetime
 import platform
 import json
+import csv
+import sqlite3
+import tempfile
+import threading
+import atexit
+import time
+import errno
+import uuid
+import multiprocessing
+import argparse
+import logging
+import logging.handlers
+from collections import deque
+from array import array
 
 try:
     from ttkthemes import ThemedTk
@@ -17,7 +32,1258 @@ try:
 except ImportError:
     _azure_theme_available = False
 
+APP_NAME = "NameFluxer"
 SETTINGS_FILE = "namefluxer_settings.json"
+LOG_FILE = "namefluxer.log"
+LOG_FILE_MAX_BYTES = 2 * 1024 * 1024
+LOG_FILE_BACKUPS = 3
+
+LOG_VIEW_MAX_LINES = 2000
+
+PROGRESS_INTERVAL = 0.25
+PROGRESS_POLL_MS = 100
+PROGRESS_LOG_INTERVAL = 5.0
+PROGRESS_RATE_WINDOW = 5.0
+
+logger = logging.getLogger("namefluxer")
+SETTINGS_VERSION = 1
+SETTINGS_SAVE_DELAY = 0.5
+SCAN_COUNT_HISTORY = 50
+
+CASE_OPTIONS = ("Manter", "Maiúsculas", "Minúsculas", "Capitalizar")
+SPACE_OPTIONS = ("Manter", "Remover Todos", "Substituir por '_'")
+DATE_FORMATS = ("YYYYMMDD", "YYYY-MM-DD", "DDMMYYYY", "DD-MM-YYYY")
+
+OPTION_CHOICES = {
+    "case_option": CASE_OPTIONS,
+    "space_option": SPACE_OPTIONS,
+    "date_input_format": DATE_FORMATS,
+    "date_output_format": DATE_FORMATS,
+}
+POSITIVE_INT_OPTIONS = ("start_num", "digits")
+
+REGEX_TIME_BUDGET = 2.0
+REGEX_SAMPLE_SIZE = 200
+REGEX_STRESS_RUN = 32
+MAX_FILENAME_LENGTH = 255
+
+DATE_FORMAT_MAP = {
+    "YYYYMMDD": "%Y%m%d",
+    "YYYY-MM-DD": "%Y-%m-%d",
+    "DDMMYYYY": "%d%m%Y",
+    "DD-MM-YYYY": "%d-%m-%Y"
+}
+
+PLAN_SPILL_THRESHOLD = 200000
+PLAN_SPILL_BATCH = 20000
+
+CONFLICT_TYPES = ("", "interno", "existente")
+PLAN_ACTIONS = ("renomear", "sobrescrever", "incrementar")
+PLAN_FIELDS = ("old_path", "new_path", "conflict", "action")
+PLAN_READ_CHUNK = 65536
+
+
+def _fold_char(char):
+    upper = char.upper()
+    return upper if len(upper) == 1 else char
+
+
+def fold_case(name):
+    if name.isascii():
+        return name.upper()
+    return "".join(map(_fold_char, name))
+
+
+class RenamePlan:
+    __slots__ = ("spill_threshold", "_dirs", "_dir_ids", "_folded_dirs", "_dir_col", "_old_col", "_new_col",
+                 "_conflict_col", "_action_col", "_targets", "_count", "_db", "_db_path",
+                 "_pending_rows", "_pending_targets", "track_sources", "_sources", "_pending_sources")
+
+    def __init__(self, spill_threshold=PLAN_SPILL_THRESHOLD, track_sources=False):
+        self.spill_threshold = spill_threshold
+        self.track_sources = track_sources
+        self._sources = {}
+        self._pending_sources = set()
+        self._dirs = []
+        self._dir_ids = {}
+        self._folded_dirs = set()
+        self._dir_col = array('I')
+        self._old_col = []
+        self._new_col = []
+        self._conflict_col = array('B')
+        self._action_col = array('B')
+        self._targets = {}
+        self._count = 0
+        self._db = None
+        self._db_path = None
+        self._pending_rows = []
+        self._pending_targets = {}
+
+    def __len__(self):
+        return self._count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    @property
+    def spilled(self):
+        return self._db is not None
+
+    def intern_dir(self, directory, case_sensitive=True):
+        dir_id = self._dir_ids.get(directory)
+        if dir_id is None:
+            dir_id = len(self._dirs)
+            self._dirs.append(directory)
+            self._dir_ids[directory] = dir_id
+            if not case_sensitive:
+                self._folded_dirs.add(dir_id)
+        return dir_id
+
+    def directory(self, dir_id):
+        return self._dirs[dir_id]
+
+    def is_case_sensitive(self, dir_id):
+        return dir_id not in self._folded_dirs
+
+    def _target_key(self, dir_id, name):
+        return fold_case(name) if dir_id in self._folded_dirs else name
+
+    def owner_of(self, dir_id, new_name):
+        target_key = self._target_key(dir_id, new_name)
+        if self._db is None:
+            targets = self._targets.get(dir_id)
+            return targets.get(target_key) if targets else None
+        owner = self._pending_targets.get((dir_id, target_key))
+        if owner is not None:
+            return owner
+        row = self._db.execute(
+            "SELECT old_name FROM entries WHERE dir_id = ? AND target_key = ? LIMIT 1",
+            (dir_id, target_key)).fetchone()
+        return row[0] if row else None
+
+    def has_source(self, dir_id, old_name):
+        if not self.track_sources:
+            return False
+        source_key = self._target_key(dir_id, old_name)
+        if self._db is None:
+            sources = self._sources.get(dir_id)
+            return sources is not None and source_key in sources
+        if (dir_id, source_key) in self._pending_sources:
+            return True
+        row = self._db.execute(
+            "SELECT 1 FROM entries WHERE dir_id = ? AND source_key = ? LIMIT 1",
+            (dir_id, source_key)).fetchone()
+        return row is not None
+
+    def add(self, dir_id, old_name, new_name, conflict=0, action=0):
+        if self._db is None and self._count >= self.spill_threshold:
+            self._spill()
+        if self._db is None:
+            self._dir_col.append(dir_id)
+            self._old_col.append(old_name)
+            self._new_col.append(new_name)
+            self._conflict_col.append(conflict)
+            self._action_col.append(action)
+            targets = self._targets.get(dir_id)
+            if targets is None:
+                targets = self._targets[dir_id] = {}
+            targets[self._target_key(dir_id, new_name)] = old_name
+            if self.track_sources:
+                sources = self._sources.get(dir_id)
+                if sources is None:
+                    sources = self._sources[dir_id] = set()
+                sources.add(self._target_key(dir_id, old_name))
+        else:
+            target_key = self._target_key(dir_id, new_name)
+            source_key = self._target_key(dir_id, old_name) if self.track_sources else None
+            self._pending_rows.append((dir_id, old_name, new_name, target_key, source_key, conflict, action))
+            self._pending_targets.setdefault((dir_id, target_key), old_name)
+            if self.track_sources:
+                self._pending_sources.add((dir_id, source_key))
+            if len(self._pending_rows) >= PLAN_SPILL_BATCH:
+                self._flush_pending()
+        self._count += 1
+
+    def _flush_pending(self):
+        if self._pending_rows:
+            self._db.executemany(
+                "INSERT INTO entries (dir_id, old_name, new_name, target_key, source_key, conflict, action) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                self._pending_rows)
+            self._pending_rows = []
+            self._pending_targets = {}
+            self._pending_sources = set()
+
+    def _spill(self):
+        fd, self._db_path = tempfile.mkstemp(prefix="namefluxer_plan_", suffix=".sqlite")
+        os.close(fd)
+        self._db = sqlite3.connect(self._db_path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode = OFF")
+        self._db.execute("PRAGMA synchronous = OFF")
+        self._db.execute("CREATE TABLE entries (seq INTEGER PRIMARY KEY, dir_id INTEGER, old_name TEXT, "
+                         "new_name TEXT, target_key TEXT, source_key TEXT, conflict INTEGER, action INTEGER)")
+        self._db.execute("CREATE INDEX entries_target ON entries (dir_id, target_key)")
+        if self.track_sources:
+            self._db.execute("CREATE INDEX entries_source ON entries (dir_id, source_key)")
+        self._db.executemany(
+            "INSERT INTO entries (dir_id, old_name, new_name, target_key, source_key, conflict, action) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            ((dir_id, old_name, new_name, self._target_key(dir_id, new_name),
+              self._target_key(dir_id, old_name) if self.track_sources else None, conflict, action)
+             for dir_id, old_name, new_name, conflict, action
+             in zip(self._dir_col, self._old_col, self._new_col, self._conflict_col, self._action_col)))
+        self._dir_col = array('I')
+        self._old_col = []
+        self._new_col = []
+        self._conflict_col = array('B')
+        self._action_col = array('B')
+        self._targets = {}
+        self._sources = {}
+
+    def __iter__(self):
+        dirs = self._dirs
+        if self._db is None:
+            rows = zip(self._dir_col, self._old_col, self._new_col, self._conflict_col, self._action_col)
+        else:
+            self._flush_pending()
+            rows = self._db.execute("SELECT dir_id, old_name, new_name, conflict, action FROM entries ORDER BY seq")
+        for dir_id, old_name, new_name, conflict, action in rows:
+            yield dirs[dir_id], old_name, new_name, CONFLICT_TYPES[conflict], PLAN_ACTIONS[action]
+
+    def close(self):
+        self._pending_rows = []
+        self._pending_targets = {}
+        self._pending_sources = set()
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+            try:
+                os.remove(self._db_path)
+            except OSError:
+                pass
+            self._db_path = None
+
+
+def _plan_file_format(path):
+    lowered = path.lower()
+    if lowered.endswith((".jsonl", ".ndjson")):
+        return "jsonl"
+    if lowered.endswith(".json"):
+        return "json"
+    return "csv"
+
+
+def _validated_plan_row(row, position):
+    if not isinstance(row, dict) or not row.get("old_path") or not row.get("new_path"):
+        raise ValueError(f"{position}: os campos 'old_path' e 'new_path' são obrigatórios.")
+    return row["old_path"], row["new_path"]
+
+
+def export_plan(plan, path):
+    count = 0
+    file_format = _plan_file_format(path)
+    if file_format == "csv":
+        with open(path, 'w', encoding='utf-8-sig', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(PLAN_FIELDS)
+            for root, old_name, new_name, conflict, action in plan:
+                writer.writerow((os.path.join(root, old_name), os.path.join(root, new_name), conflict, action))
+                count += 1
+    else:
+        separator = "\n" if file_format == "jsonl" else ",\n"
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            if file_format == "json":
+                f.write("[\n")
+            for root, old_name, new_name, conflict, action in plan:
+                row = dict(zip(PLAN_FIELDS, (os.path.join(root, old_name), os.path.join(root, new_name), conflict, action)))
+                if count and file_format == "json":
+                    f.write(separator)
+                f.write(json.dumps(row, ensure_ascii=False))
+                if file_format == "jsonl":
+                    f.write(separator)
+                count += 1
+            if file_format == "json":
+                f.write("\n]\n")
+    return count
+
+
+def iter_plan_file(path):
+    file_format = _plan_file_format(path)
+    if file_format == "csv":
+        with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+            reader = csv.DictReader(f)
+            if not reader.fieldnames or "old_path" not in reader.fieldnames or "new_path" not in reader.fieldnames:
+                raise ValueError("O arquivo CSV deve conter as colunas 'old_path' e 'new_path'.")
+            for row in reader:
+                yield _validated_plan_row(row, f"Linha {reader.line_num}")
+        return
+
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        first_char = ""
+        while True:
+            first_char = f.read(1)
+            if not first_char or not first_char.isspace():
+                break
+        f.seek(0)
+        if first_char == "[":
+            for index, row in enumerate(_iter_json_array(f), 1):
+                yield _validated_plan_row(row, f"Item {index}")
+            return
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Linha {line_number}: JSON inválido ({e}).")
+            yield _validated_plan_row(row, f"Linha {line_number}")
+
+
+def _iter_json_array(f):
+    decoder = json.JSONDecoder()
+    buffer = ""
+    position = 0
+
+    def read_more():
+        nonlocal buffer, position
+        chunk = f.read(PLAN_READ_CHUNK)
+        if not chunk:
+            return False
+        buffer = buffer[position:] + chunk
+        position = 0
+        return True
+
+    def next_char():
+        nonlocal position
+        while True:
+            while position < len(buffer) and buffer[position].isspace():
+                position += 1
+            if position < len(buffer):
+                return buffer[position]
+            if not read_more():
+                return ""
+
+    if next_char() != "[":
+        raise ValueError("JSON inválido: o arquivo deve conter um array de objetos.")
+    position += 1
+    if next_char() == "]":
+        position += 1
+    else:
+        index = 0
+        while True:
+            index += 1
+            while True:
+                try:
+                    row, end = decoder.raw_decode(buffer, position)
+                except json.JSONDecodeError as e:
+                    if read_more():
+                        continue
+                    raise ValueError(f"Item {index}: JSON inválido ({e}).")
+                if end == len(buffer) and read_more():
+                    continue
+                break
+            position = end
+            yield row
+            char = next_char()
+            position += 1
+            if char == "]":
+                break
+            if char != ",":
+                raise ValueError(f"JSON inválido: esperado ',' ou ']' após o item {index}.")
+            if next_char() == "]":
+                raise ValueError(f"JSON inválido: vírgula sobrando após o item {index}.")
+    if next_char():
+        raise ValueError("JSON inválido: conteúdo extra após o fim do array.")
+
+
+def format_duration(seconds):
+    minutes, seconds = divmod(int(round(seconds)), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:d}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes:02d}:{seconds:02d}"
+
+
+class ProgressTracker:
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.listeners = []
+        self.phase = ""
+        self.phase_finished = False
+        self.scanned = 0
+        self.planned = 0
+        self.renamed = 0
+        self.done = 0
+        self.total = None
+        self.rate = 0.0
+        self.elapsed = 0.0
+        self._phase_started_at = clock()
+        self._samples = deque()
+        self._next_report = float('inf')
+
+    def add_listener(self, callback, interval=PROGRESS_INTERVAL):
+        self.listeners.append([callback, interval, float('-inf')])
+        self._next_report = float('-inf')
+
+    def start_phase(self, phase, total=None):
+        now = self.clock()
+        self.phase = phase
+        self.phase_finished = False
+        self.done = 0
+        self.total = total
+        self.rate = 0.0
+        self.elapsed = 0.0
+        self._phase_started_at = now
+        self._samples.clear()
+        self._samples.append((now, 0))
+        self.report(force=True)
+
+    def tick(self, count=1):
+        self.done += count
+        if self.clock() >= self._next_report:
+            self.report()
+
+    def finish_phase(self):
+        now = self.clock()
+        self.phase_finished = True
+        if self.total is not None:
+            self.total = self.done
+        self.elapsed = now - self._phase_started_at
+        self.rate = self.done / self.elapsed if self.elapsed > 0 else 0.0
+        self.report(force=True, update_rate=False)
+
+    def report(self, force=False, update_rate=True):
+        now = self.clock()
+        if update_rate:
+            self._update_rate(now)
+        next_report = float('inf')
+        for listener in self.listeners:
+            callback, interval, last_report = listener
+            if force or now - last_report >= interval:
+                listener[2] = last_report = now
+                callback(self)
+            next_report = min(next_report, last_report + interval)
+        self._next_report = next_report
+
+    def _update_rate(self, now):
+        self.elapsed = now - self._phase_started_at
+        samples = self._samples
+        samples.append((now, self.done))
+        while len(samples) > 2 and now - samples[0][0] > PROGRESS_RATE_WINDOW:
+            samples.popleft()
+        first_time, first_done = samples[0]
+        if now > first_time:
+            self.rate = (self.done - first_done) / (now - first_time)
+
+    @property
+    def fraction(self):
+        if not self.total:
+            return None
+        return min(self.done / self.total, 1.0)
+
+    @property
+    def eta(self):
+        if self.total is None or self.rate <= 0 or self.done > self.total:
+            return None
+        return max(self.total - self.done, 0) / self.rate
+
+    def status_line(self):
+        position = f"{self.done}/{self.total}" if self.total is not None else str(self.done)
+        if self.fraction is not None:
+            position += f" ({self.fraction:.1%})"
+        if self.phase_finished:
+            timing = f"concluído em {format_duration(self.elapsed)}"
+        else:
+            eta = self.eta
+            timing = f"ETA {format_duration(eta)}" if eta is not None else "ETA --:--"
+        return (f"{self.phase}: {position} | varridos: {self.scanned}, planejados: {self.planned}, "
+                f"renomeados: {self.renamed} | {self.rate:.0f} arq/s | {timing}")
+
+
+def log_progress(tracker):
+    logger.info(tracker.status_line())
+
+
+def setup_file_logging(path=None):
+    path = path or os.path.join(default_settings_dir(), LOG_FILE)
+    logger.setLevel(logging.INFO)
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        handler.close()
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        handler = logging.handlers.RotatingFileHandler(path, maxBytes=LOG_FILE_MAX_BYTES,
+                                                       backupCount=LOG_FILE_BACKUPS, encoding='utf-8')
+    except OSError:
+        return None
+    handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+    logger.addHandler(handler)
+    return path
+
+
+class LocalFileSystem:
+    def __init__(self):
+        self._case_sensitivity = {}
+
+    def is_case_sensitive(self, directory, sample_name=None):
+        case_sensitive = self._case_sensitivity.get(directory)
+        if case_sensitive is None:
+            case_sensitive = self._case_sensitivity[directory] = self._probe_case_sensitivity(directory, sample_name)
+        return case_sensitive
+
+    def _probe_case_sensitivity(self, directory, sample_name):
+        candidates = [(directory, sample_name)] if sample_name else []
+        candidates.append(os.path.split(os.path.abspath(directory)))
+        for parent, name in candidates:
+            swapped = name.swapcase()
+            if not name or swapped == name:
+                continue
+            try:
+                swapped_stat = os.stat(os.path.join(parent, swapped))
+            except FileNotFoundError:
+                return True
+            except OSError:
+                continue
+            try:
+                return not os.path.samestat(os.stat(os.path.join(parent, name)), swapped_stat)
+            except OSError:
+                continue
+        return platform.system() not in ("Windows", "Darwin")
+
+    def walk(self, top):
+        stack = [top]
+        while stack:
+            root = stack.pop()
+            try:
+                scandir_it = os.scandir(root)
+            except OSError:
+                continue
+            dirnames = []
+            yield root, dirnames, self._iter_files(scandir_it, dirnames)
+            stack.extend(os.path.join(root, name) for name in reversed(dirnames))
+
+    @staticmethod
+    def _iter_files(scandir_it, dirnames):
+        with scandir_it:
+            for entry in scandir_it:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                if not is_dir:
+                    yield entry.name
+                elif not entry.is_symlink():
+                    dirnames.append(entry.name)
+
+    def exists(self, path):
+        return os.path.exists(path)
+
+    def isdir(self, path):
+        return os.path.isdir(path)
+
+    def isfile(self, path):
+        return os.path.isfile(path)
+
+    def rename(self, src, dst):
+        os.rename(src, dst)
+
+    def replace(self, src, dst):
+        os.replace(src, dst)
+
+
+class MemoryFileSystem:
+    def __init__(self, files=(), case_sensitive=True, latency=0.0, rename_replaces=True):
+        self.case_sensitive = case_sensitive
+        self.rename_replaces = rename_replaces
+        self.latency = latency
+        self.operation_count = 0
+        self._dirs = {}
+        for path in files:
+            self.add_file(path)
+
+    def _key(self, name):
+        return name if self.case_sensitive else fold_case(name)
+
+    def is_case_sensitive(self, directory, sample_name=None):
+        return self.case_sensitive
+
+    def _wait(self):
+        self.operation_count += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _node(self, path):
+        return self._dirs.get(self._key(os.path.normpath(path)))
+
+    def add_dir(self, path):
+        path = os.path.normpath(path)
+        missing = []
+        current = path
+        while self._key(current) not in self._dirs:
+            missing.append(current)
+            parent = os.path.normpath(os.path.dirname(current))
+            if parent == current:
+                break
+            current = parent
+        for current in reversed(missing):
+            self._dirs[self._key(current)] = ({}, {})
+            parent, name = os.path.split(current)
+            parent = os.path.normpath(parent)
+            if name and parent != current:
+                self._dirs[self._key(parent)][0][self._key(name)] = name
+        return self._dirs[self._key(path)]
+
+    def add_file(self, path):
+        parent, name = os.path.split(os.path.normpath(path))
+        self.add_dir(parent)[1][self._key(name)] = name
+
+    def listdir(self, path):
+        node = self._node(path)
+        if node is None:
+            raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), path)
+        return list(node[0].values()) + list(node[1].values())
+
+    def walk(self, top):
+        stack = [os.path.normpath(top)]
+        while stack:
+            root = stack.pop()
+            self._wait()
+            node = self._node(root)
+            if node is None:
+                continue
+            dirnames = list(node[0].values())
+            yield root, dirnames, list(node[1].values())
+            stack.extend(os.path.join(root, name) for name in reversed(dirnames))
+
+    def exists(self, path):
+        self._wait()
+        parent, name = os.path.split(os.path.normpath(path))
+        node = self._node(parent)
+        if node is None:
+            return self._node(path) is not None
+        key = self._key(name)
+        return key in node[1] or key in node[0]
+
+    def isdir(self, path):
+        self._wait()
+        return self._node(path) is not None
+
+    def isfile(self, path):
+        self._wait()
+        parent, name = os.path.split(os.path.normpath(path))
+        node = self._node(parent)
+        return node is not None and self._key(name) in node[1]
+
+    def rename(self, src, dst):
+        self._move(src, dst, self.rename_replaces)
+
+    def replace(self, src, dst):
+        self._move(src, dst, True)
+
+    def _move(self, src, dst, replace_existing):
+        self._wait()
+        src_parent, src_name = os.path.split(os.path.normpath(src))
+        dst_parent, dst_name = os.path.split(os.path.normpath(dst))
+        src_node = self._node(src_parent)
+        dst_node = self._node(dst_parent)
+        if src_node is None or self._key(src_name) not in src_node[1]:
+            raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), src)
+        if dst_node is None:
+            raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), dst)
+        if self._key(dst_name) in dst_node[0]:
+            raise IsADirectoryError(errno.EISDIR, os.strerror(errno.EISDIR), dst)
+        same_file = src_node is dst_node and self._key(src_name) == self._key(dst_name)
+        if not replace_existing and not same_file and self._key(dst_name) in dst_node[1]:
+            raise FileExistsError(errno.EEXIST, os.strerror(errno.EEXIST), dst)
+        del src_node[1][self._key(src_name)]
+        dst_node[1][self._key(dst_name)] = dst_name
+
+
+def sanitize_filename(filename):
+    invalid_chars = r'[\\/:*?"<>|]'
+    return re.sub(invalid_chars, '', filename)
+
+
+def regex_stress_samples(names, pattern=""):
+    samples = []
+    run_chars = {char for char in pattern if char.isalnum()}
+    for name in names:
+        if name:
+            samples.append((name * (MAX_FILENAME_LENGTH // len(name) + 1))[:MAX_FILENAME_LENGTH])
+            run_chars.add(name[0])
+    for char in sorted(run_chars):
+        samples.append(char * REGEX_STRESS_RUN + "!")
+    return samples
+
+
+def _time_regex(pattern, samples):
+    regex = re.compile(pattern)
+    start = time.perf_counter()
+    for sample in samples:
+        regex.sub('', sample)
+    return time.perf_counter() - start
+
+
+def _regex_worker_ready():
+    return True
+
+
+def probe_regex(pattern, samples, time_budget=REGEX_TIME_BUDGET):
+    re.compile(pattern)
+    pool = multiprocessing.Pool(1)
+    try:
+        pool.apply(_regex_worker_ready)
+        result = pool.apply_async(_time_regex, (pattern, list(samples)))
+        try:
+            return result.get(time_budget)
+        except multiprocessing.TimeoutError:
+            return None
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+class RenamePlanner:
+    def __init__(self, options, fs=None, log=None, progress=None):
+        self.options = validate_options(options)
+        self.fs = fs or LocalFileSystem()
+        self.log = log or (lambda message: None)
+        self.progress = progress or ProgressTracker()
+        self.pattern = self._expand_pattern(self.options["output_pattern"])
+        self.formatted_date = self._format_date()
+        self.remove_regex = None
+        self.remove_pattern_error = None
+        if self.options["remove_pattern"]:
+            try:
+                self.remove_regex = re.compile(self.options["remove_pattern"])
+            except re.error as e:
+                self.remove_pattern_error = e
+
+    def _expand_pattern(self, pattern):
+        processed_pattern = pattern
+
+        if self.options["sequential"] and "{sequence}" not in processed_pattern:
+            if "{ext}" in processed_pattern:
+                ext_pos = processed_pattern.rfind("{ext}")
+                processed_pattern = processed_pattern[:ext_pos] + "_{sequence}" + processed_pattern[ext_pos:]
+            else:
+                processed_pattern += "_{sequence}"
+
+        if self.options["use_custom_date"] and "{date}" not in processed_pattern:
+            if "{ext}" in processed_pattern:
+                ext_pos = processed_pattern.rfind("{ext}")
+                if "{sequence}" in processed_pattern:
+                    seq_pos = processed_pattern.rfind("{sequence}")
+                    if seq_pos < ext_pos:
+                        insert_at = seq_pos + len("{sequence}")
+                        processed_pattern = processed_pattern[:insert_at] + "_{date}" + processed_pattern[insert_at:]
+                    else:
+                        processed_pattern = processed_pattern[:ext_pos] + "_{date}" + processed_pattern[ext_pos:]
+                else:
+                    processed_pattern = processed_pattern[:ext_pos] + "_{date}" + processed_pattern[ext_pos:]
+            else:
+                processed_pattern += "_{date}"
+
+        return processed_pattern
+
+    def has_transformation(self):
+        options = self.options
+        return any([
+            options["replace_old"],
+            options["replace_new"],
+            options["remove_pattern"],
+            options["case_option"] != "Manter",
+            options["space_option"] != "Manter",
+            options["sequential"],
+            options["use_custom_date"],
+            options["output_pattern"].strip().lower() not in ["{original_name}.{ext}", "{original_name}{ext}"]
+        ])
+
+    def custom_date_valid(self):
+        if not self.options["use_custom_date"]:
+            return True
+        try:
+            datetime.strptime(self.options["custom_date"], DATE_FORMAT_MAP[self.options["date_input_format"]])
+        except (KeyError, ValueError):
+            return False
+        return True
+
+    def _format_date(self):
+        if not self.options["use_custom_date"]:
+            return ""
+
+        date_str = self.options["custom_date"]
+        input_python_format = DATE_FORMAT_MAP.get(self.options["date_input_format"])
+        output_python_format = DATE_FORMAT_MAP.get(self.options["date_output_format"])
+
+        if not input_python_format or not output_python_format:
+            self.log(f"Erro interno: Formato de data inválido. Placeholder {{date}} será ignorado.")
+            return ""
+        try:
+            return datetime.strptime(date_str, input_python_format).strftime(output_python_format)
+        except ValueError:
+            self.log(f"Aviso: Data '{date_str}' não corresponde ao formato de entrada '{input_python_format}'. O placeholder {{date}} será ignorado ou aparecerá vazio.")
+        except Exception as e:
+            self.log(f"Erro inesperado ao processar data: {e}. O placeholder {{date}} será ignorado.")
+        return ""
+
+    def generate_new_filename(self, original_name_no_ext, original_ext, sequence_num=None):
+        options = self.options
+        new_name_no_ext_processed = original_name_no_ext
+
+        old_text = options["replace_old"]
+        if old_text:
+            new_name_no_ext_processed = new_name_no_ext_processed.replace(old_text, options["replace_new"])
+
+        if self.remove_regex is not None:
+            new_name_no_ext_processed = self.remove_regex.sub('', new_name_no_ext_processed)
+
+        space_option = options["space_option"]
+        if space_option == "Remover Todos":
+            new_name_no_ext_processed = new_name_no_ext_processed.replace(" ", "")
+        elif space_option == "Substituir por '_'":
+            new_name_no_ext_processed = new_name_no_ext_processed.replace(" ", "_")
+
+        case_option = options["case_option"]
+        if case_option == "Maiúsculas":
+            new_name_no_ext_processed = new_name_no_ext_processed.upper()
+        elif case_option == "Minúsculas":
+            new_name_no_ext_processed = new_name_no_ext_processed.lower()
+        elif case_option == "Capitalizar":
+            new_name_no_ext_processed = new_name_no_ext_processed.capitalize()
+
+        formatted_sequence = ""
+        if sequence_num is not None:
+            formatted_sequence = f"{sequence_num:0{options['digits']}d}"
+
+        final_name_parts = {
+            "{original_name}": new_name_no_ext_processed,
+            "{sequence}": formatted_sequence,
+            "{date}": self.formatted_date,
+            "{ext}": original_ext.lower() if options["ignore_ext_case"] else original_ext
+        }
+
+        new_full_name_base = self.pattern
+        for placeholder, value in final_name_parts.items():
+            new_full_name_base = new_full_name_base.replace(placeholder, value)
+
+        return sanitize_filename(new_full_name_base)
+
+    def sample_names(self, directory, limit=REGEX_SAMPLE_SIZE):
+        names = []
+        for _, _, files in self.fs.walk(directory):
+            for filename in files:
+                names.append(os.path.splitext(filename)[0])
+                if len(names) >= limit:
+                    return names
+            if not self.options["recursive"]:
+                break
+        return names
+
+    def probe_remove_pattern(self, directory, time_budget=None):
+        pattern = self.options["remove_pattern"]
+        if time_budget is None:
+            time_budget = self.options["regex_time_budget"]
+        if not time_budget:
+            return 0.0, 0
+        names = self.sample_names(directory) if directory and self.fs.isdir(directory) else []
+        samples = names + regex_stress_samples(names, pattern)
+        if not samples:
+            return 0.0, 0
+        return probe_regex(pattern, samples, time_budget), len(samples)
+
+    def build_plan(self, plan, directory, expected_count=None):
+        sequential = self.options["sequential"]
+        counter = self.options["start_num"]
+        scanned_count = 0
+        progress = self.progress
+        if self.remove_pattern_error is not None:
+            self.log(f"Aviso: Padrão Regex inválido '{self.options['remove_pattern']}' ({self.remove_pattern_error}). Ignorando.")
+        progress.start_phase("Planejamento", total=expected_count)
+
+        for root, _, files in self.fs.walk(directory):
+            dir_id = None
+            for filename in files:
+                if dir_id is None:
+                    dir_id = plan.intern_dir(root, self.fs.is_case_sensitive(root, filename))
+                scanned_count += 1
+                original_name_no_ext, original_ext = os.path.splitext(filename)
+                new_basename_base = self.generate_new_filename(
+                    original_name_no_ext, original_ext, counter if sequential else None
+                )
+
+                if sequential:
+                    counter += 1
+
+                if self.plan_rename(plan, dir_id, filename, new_basename_base):
+                    progress.planned += 1
+                progress.scanned += 1
+                progress.tick()
+            if not self.options["recursive"]:
+                break
+
+        progress.finish_phase()
+        return scanned_count
+
+    def build_plan_from_file(self, plan, path):
+        row_count = 0
+        progress = self.progress
+        progress.start_phase("Importação")
+        for old_path, new_path in iter_plan_file(path):
+            row_count += 1
+            progress.scanned += 1
+            progress.tick()
+            root, filename = os.path.split(os.path.normpath(old_path))
+            new_root, new_basename_base = os.path.split(new_path)
+            if os.path.normcase(os.path.normpath(root)) != os.path.normcase(os.path.normpath(new_root or root)):
+                self.log(f"Ignorando '{old_path}': o novo caminho '{new_path}' está em outro diretório.")
+                continue
+            new_basename_base = sanitize_filename(new_basename_base)
+            if not new_basename_base:
+                self.log(f"Ignorando '{old_path}': novo nome vazio.")
+                continue
+            if not self.fs.isfile(old_path):
+                self.log(f"Ignorando '{old_path}': arquivo de origem não encontrado.")
+                continue
+            dir_id = plan.intern_dir(root, self.fs.is_case_sensitive(root, filename))
+            if plan.has_source(dir_id, filename):
+                self.log(f"Ignorando entrada {row_count}: '{old_path}' aparece mais de uma vez no plano.")
+                continue
+            if self.plan_rename(plan, dir_id, filename, new_basename_base):
+                progress.planned += 1
+        progress.finish_phase()
+        return row_count
+
+    def plan_rename(self, plan, dir_id, filename, new_basename_base):
+        root = plan.directory(dir_id)
+        final_new_name = new_basename_base
+        conflict = 0
+        action = 0
+        self_collision = not plan.is_case_sensitive(dir_id) and fold_case(new_basename_base) == fold_case(filename)
+
+        owner = plan.owner_of(dir_id, new_basename_base)
+        if owner is not None and owner != filename:
+            conflict = 1
+            self.log(f"Conflito INTERNO detectado para '{filename}': outro arquivo ('{owner}') também renomeia para '{new_basename_base}'.")
+        elif new_basename_base != filename and not self_collision and self.fs.exists(os.path.join(root, new_basename_base)):
+            conflict = 2
+            self.log(f"Conflito com ARQUIVO EXISTENTE no disco para '{filename}': '{new_basename_base}' já existe.")
+
+        if conflict:
+            if self.options["overwrite_conflict"]:
+                action = 1
+                self.log(f" -> Sobrescrevendo o arquivo existente em '{new_basename_base}' (opção ativada).")
+            elif self.options["add_increment_on_conflict"]:
+                action = 2
+                increment = 1
+                original_name_no_ext_candidate, original_ext_candidate = os.path.splitext(new_basename_base)
+                while True:
+                    temp_new_name = f"{original_name_no_ext_candidate} ({increment}){original_ext_candidate}"
+                    if plan.owner_of(dir_id, temp_new_name) is None and not self.fs.exists(os.path.join(root, temp_new_name)):
+                        final_new_name = temp_new_name
+                        self.log(f" -> Conflito resolvido com incremento: '{final_new_name}'")
+                        break
+                    increment += 1
+            else:
+                self.log(f" -> Sem opção de resolução de conflito. Ignorando renomeação de '{filename}'.")
+                return False
+
+        if final_new_name == filename:
+            self.log(f"Ignorando '{filename}': Nome inalterado após todas as transformações.")
+            return False
+
+        plan.add(dir_id, filename, final_new_name, conflict, action)
+        return True
+
+    def execute_plan(self, plan, preview=False):
+        renamed_count = 0
+        progress = self.progress
+        progress.start_phase("Prévia" if preview else "Renomeação", total=len(plan))
+        for root, old_name, new_name, _, action in plan:
+            self.log(f"'{old_name}' -> '{new_name}'")
+            if not preview:
+                try:
+                    if fold_case(old_name) == fold_case(new_name) and not self.fs.is_case_sensitive(root, old_name):
+                        self._rename_case_only(root, old_name, new_name)
+                    elif action == "sobrescrever":
+                        self.fs.replace(os.path.join(root, old_name), os.path.join(root, new_name))
+                    else:
+                        self.fs.rename(os.path.join(root, old_name), os.path.join(root, new_name))
+                    renamed_count += 1
+                    progress.renamed += 1
+                except OSError as e:
+                    self.log(f"Erro ao renomear '{old_name}' para '{new_name}': {e}")
+                except Exception as e:
+                    self.log(f"Ocorreu um erro inesperado ao renomear '{old_name}': {e}")
+            progress.tick()
+        progress.finish_phase()
+        return renamed_count
+
+    def _rename_case_only(self, root, old_name, new_name):
+        old_path = os.path.join(root, old_name)
+        attempts = 3
+        while True:
+            temp_path = os.path.join(root, f"{old_name}.{uuid.uuid4().hex[:12]}.namefluxer.tmp")
+            try:
+                self.fs.rename(old_path, temp_path)
+                break
+            except FileExistsError:
+                attempts -= 1
+                if not attempts:
+                    raise
+        try:
+            self.fs.rename(temp_path, os.path.join(root, new_name))
+        except OSError as e:
+            try:
+                self.fs.rename(temp_path, old_path)
+            except OSError as rollback_error:
+                self.log(f"Erro ao renomear '{old_name}' para '{new_name}' ({e}) e ao restaurar o nome original "
+                         f"({rollback_error}). O arquivo ficou em '{temp_path}'.")
+            raise e
+
+
+def default_options():
+    return {
+        "directory": "",
+        "output_pattern": "",
+        "sequential": False,
+        "start_num": 1,
+        "digits": 3,
+        "recursive": False,
+        "replace_old": "",
+        "replace_new": "",
+        "remove_pattern": "",
+        "regex_time_budget": REGEX_TIME_BUDGET,
+        "case_option": "Manter",
+        "space_option": "Manter",
+        "use_custom_date": False,
+        "custom_date": datetime.now().strftime("%Y%m%d"),
+        "date_input_format": "YYYYMMDD",
+        "date_output_format": "YYYYMMDD",
+        "ignore_ext_case": True,
+        "overwrite_conflict": False,
+        "add_increment_on_conflict": True,
+    }
+
+
+def validate_options(options):
+    validated = default_options()
+    if not isinstance(options, dict):
+        return validated
+    for key, default in validated.items():
+        value = options.get(key, default)
+        if type(default) is float and type(value) is int:
+            value = float(value)
+        if type(value) is not type(default):
+            continue
+        if type(value) is float and value < 0:
+            continue
+        if key in OPTION_CHOICES and value not in OPTION_CHOICES[key]:
+            continue
+        if key in POSITIVE_INT_OPTIONS and value <= 0:
+            continue
+        validated[key] = value
+    return validated
+
+
+def default_settings_dir():
+    system = platform.system()
+    if system == "Windows":
+        base = os.environ.get("APPDATA") or os.path.expanduser("~")
+        return os.path.join(base, APP_NAME)
+    if system == "Darwin":
+        return os.path.join(os.path.expanduser("~"), "Library", "Application Support", APP_NAME)
+    base = os.environ.get("XDG_CONFIG_HOME") or os.path.join(os.path.expanduser("~"), ".config")
+    return os.path.join(base, APP_NAME.lower())
+
+
+class SettingsStore:
+    def __init__(self, path=None, save_delay=SETTINGS_SAVE_DELAY):
+        self.path = path or os.path.join(default_settings_dir(), SETTINGS_FILE)
+        self.save_delay = save_delay
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._timer = None
+        self._dirty = False
+        self.load_error = None
+        self.save_blocked = False
+        self.data = self._load()
+        atexit.register(self.flush)
+
+    def _read(self, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            raw = json.load(f)
+        if not isinstance(raw, dict):
+            raise ValueError("o conteúdo não é um objeto JSON")
+        return raw
+
+    def _load(self):
+        raw = None
+        try:
+            raw = self._read(self.path)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            self._set_aside(e)
+        if raw is None and os.path.exists(SETTINGS_FILE):
+            try:
+                raw = self._read(SETTINGS_FILE)
+            except (OSError, ValueError):
+                pass
+        return self.validate(raw)
+
+    def _set_aside(self, error):
+        backup_path = f"{self.path}.{time.strftime('%Y%m%d-%H%M%S')}.corrupt"
+        try:
+            os.replace(self.path, backup_path)
+        except OSError:
+            self.save_blocked = True
+            self.load_error = (f"Não foi possível ler as configurações em '{self.path}' ({error}). "
+                               "As opções padrão serão usadas e o arquivo não será sobrescrito.")
+            return
+        self.load_error = (f"As configurações em '{self.path}' estavam corrompidas ({error}) e foram movidas para "
+                           f"'{backup_path}'. As opções padrão serão usadas.")
+
+    @staticmethod
+    def validate(raw):
+        if not isinstance(raw, dict):
+            raw = {}
+        presets = raw.get("presets")
+        if not isinstance(presets, dict):
+            presets = {}
+        scan_counts = raw.get("scan_counts")
+        if not isinstance(scan_counts, dict):
+            scan_counts = {}
+        active_preset = raw.get("active_preset")
+        data = {
+            "version": SETTINGS_VERSION,
+            "dont_show_welcome_again": raw.get("dont_show_welcome_again") is True,
+            "options": validate_options(raw.get("options")),
+            "presets": {name: validate_options(options) for name, options in presets.items()
+                        if isinstance(name, str) and name.strip()},
+            "active_preset": "",
+            "scan_counts": dict(list((key, count) for key, count in scan_counts.items()
+                                     if isinstance(key, str) and type(count) is int and count > 0)[-SCAN_COUNT_HISTORY:]),
+        }
+        if isinstance(active_preset, str) and active_preset in data["presets"]:
+            data["active_preset"] = active_preset
+        return data
+
+    def get(self, key, default=None):
+        with self._lock:
+            return self.data.get(key, default)
+
+    def set(self, key, value):
+        with self._lock:
+            if self.data.get(key) == value:
+                return
+            self.data[key] = value
+        self.schedule_save()
+
+    @property
+    def options(self):
+        with self._lock:
+            return dict(self.data["options"])
+
+    def update_options(self, options):
+        options = validate_options(options)
+        with self._lock:
+            if self.data["options"] == options:
+                return
+            self.data["options"] = options
+        self.schedule_save()
+
+    def preset_names(self):
+        with self._lock:
+            return sorted(self.data["presets"], key=str.lower)
+
+    def preset(self, name):
+        with self._lock:
+            options = self.data["presets"].get(name)
+            return dict(options) if options is not None else None
+
+    def save_preset(self, name, options):
+        with self._lock:
+            self.data["presets"][name] = validate_options(options)
+            self.data["active_preset"] = name
+        self.schedule_save()
+
+    def delete_preset(self, name):
+        with self._lock:
+            if self.data["presets"].pop(name, None) is None:
+                return False
+            if self.data["active_preset"] == name:
+                self.data["active_preset"] = ""
+        self.schedule_save()
+        return True
+
+    @staticmethod
+    def _scan_key(directory, recursive):
+        return f"{'R' if recursive else 'N'}|{os.path.normcase(os.path.abspath(directory))}"
+
+    def scan_count(self, directory, recursive):
+        with self._lock:
+            return self.data["scan_counts"].get(self._scan_key(directory, recursive))
+
+    def set_scan_count(self, directory, recursive, count):
+        key = self._scan_key(directory, recursive)
+        with self._lock:
+            scan_counts = self.data["scan_counts"]
+            if scan_counts.get(key) == count:
+                return
+            scan_counts.pop(key, None)
+            if count:
+                scan_counts[key] = count
+            while len(scan_counts) > SCAN_COUNT_HISTORY:
+                del scan_counts[next(iter(scan_counts))]
+        self.schedule_save()
+
+    def schedule_save(self):
+        with self._lock:
+            self._dirty = True
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.save_delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        if self.save_blocked:
+            return False
+        with self._write_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                if not self._dirty:
+                    return True
+                payload = json.dumps(self.data, indent=4, ensure_ascii=False)
+                self._dirty = False
+            try:
+                self._write_atomic(payload)
+            except OSError:
+                with self._lock:
+                    self._dirty = True
+                return False
+        return True
+
+    def _write_atomic(self, payload):
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".namefluxer_settings_", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+
 
 class FileRenamerApp:
     def __init__(self, master):
@@ -94,6 +1360,16 @@ class FileRenamerApp:
         style.map('Secondary.TButton',
                   background=[('active', '#DDE3E9')])
 
+        self.settings = SettingsStore()
+        self._applying_options = False
+        self.busy = False
+        self.busy_states = []
+        self.progress_state = None
+        self.log_truncated = False
+        self.log_lock = threading.Lock()
+        self.pending_log = deque(maxlen=LOG_VIEW_MAX_LINES)
+        self.pending_log_count = 0
+
         self.directory_path = tk.StringVar()
         self.output_pattern_var = tk.StringVar(value="")
         self.sequential_var = tk.BooleanVar(value=False)
@@ -105,6 +1381,7 @@ class FileRenamerApp:
         self.replace_new_var = tk.StringVar()
 
         self.remove_pattern_var = tk.StringVar()
+        self.regex_time_budget_var = tk.DoubleVar(value=REGEX_TIME_BUDGET)
 
         self.case_option = tk.StringVar(value="Manter")
         self.space_option = tk.StringVar(value="Manter")
@@ -118,6 +1395,30 @@ class FileRenamerApp:
         self.overwrite_conflict_var = tk.BooleanVar(value=False)
         self.add_increment_on_conflict_var = tk.BooleanVar(value=True)
 
+        self.preset_var = tk.StringVar()
+
+        self.option_vars = {
+            "directory": self.directory_path,
+            "output_pattern": self.output_pattern_var,
+            "sequential": self.sequential_var,
+            "start_num": self.start_num_var,
+            "digits": self.digits_var,
+            "recursive": self.recursive_var,
+            "replace_old": self.replace_old_var,
+            "replace_new": self.replace_new_var,
+            "remove_pattern": self.remove_pattern_var,
+            "regex_time_budget": self.regex_time_budget_var,
+            "case_option": self.case_option,
+            "space_option": self.space_option,
+            "use_custom_date": self.use_custom_date_var,
+            "custom_date": self.custom_date_var,
+            "date_input_format": self.date_input_format_option,
+            "date_output_format": self.date_output_format_option,
+            "ignore_ext_case": self.ignore_ext_case_var,
+            "overwrite_conflict": self.overwrite_conflict_var,
+            "add_increment_on_conflict": self.add_increment_on_conflict_var,
+        }
+
         self.notebook = ttk.Notebook(master)
         self.notebook.pack(pady=15, padx=15, expand=True, fill="both")
 
@@ -140,8 +1441,25 @@ class FileRenamerApp:
         action_frame = ttk.Frame(master, style='TFrame')
         action_frame.pack(pady=10, padx=15, fill="x")
 
-        ttk.Button(action_frame, text="✨ Prévia das Mudanças", command=lambda: self.run_renamer(preview=True), style='Accent.TButton').pack(side="left", expand=True, fill="x", padx=5)
-        ttk.Button(action_frame, text="🚀 Renomear Agora!", command=lambda: self.run_renamer(preview=False), style='Accent.TButton').pack(side="right", expand=True, fill="x", padx=5)
+        self.preview_button = ttk.Button(action_frame, text="✨ Prévia das Mudanças", command=lambda: self.run_renamer(preview=True), style='Accent.TButton')
+        self.preview_button.pack(side="left", expand=True, fill="x", padx=5)
+        self.rename_button = ttk.Button(action_frame, text="🚀 Renomear Agora!", command=lambda: self.run_renamer(preview=False), style='Accent.TButton')
+        self.rename_button.pack(side="right", expand=True, fill="x", padx=5)
+
+        plan_frame = ttk.Frame(master, style='TFrame')
+        plan_frame.pack(padx=15, fill="x")
+
+        self.export_plan_button = ttk.Button(plan_frame, text="💾 Exportar Plano...", command=self.export_plan_dialog, style='Secondary.TButton')
+        self.export_plan_button.pack(side="left", padx=5)
+        self.import_plan_button = ttk.Button(plan_frame, text="📂 Importar Plano...", command=self.import_plan_dialog, style='Secondary.TButton')
+        self.import_plan_button.pack(side="left", padx=5)
+
+        progress_frame = ttk.Frame(master, style='TFrame')
+        progress_frame.pack(pady=(10,0), padx=15, fill="x")
+        self.progress_bar = ttk.Progressbar(progress_frame, mode='determinate', maximum=100)
+        self.progress_bar.pack(fill="x")
+        self.progress_status_var = tk.StringVar(value="Pronto.")
+        ttk.Label(progress_frame, textvariable=self.progress_status_var, foreground=self.secondary_color, font=('Segoe UI', 9)).pack(anchor="w", pady=(3,0))
 
         self.log_text = scrolledtext.ScrolledText(master, wrap=tk.WORD, width=60, height=15, state='disabled',
                                                  font=('Consolas', 9), bg='#ffffff', fg='#333333', relief='flat', borderwidth=1, highlightbackground=self.light_gray)
@@ -149,6 +1467,7 @@ class FileRenamerApp:
 
         self.add_all_tooltips()
         self.load_settings()
+        master.protocol("WM_DELETE_WINDOW", self.on_close)
         self.show_welcome_message()
 
     def _add_tooltip_for_widget(self, widget, text):
@@ -175,6 +1494,8 @@ class FileRenamerApp:
         self._add_tooltip_for_widget(self.replace_old_entry, "Texto a ser encontrado e substituído no nome do arquivo.")
         self._add_tooltip_for_widget(self.replace_new_entry, "Texto pelo qual o 'Encontrar' será trocado.")
         self._add_tooltip_for_widget(self.remove_pattern_entry, "Expressão Regular (Regex) para remover partes do nome. Ex: `\\(.*?\\)` para remover texto entre parênteses.")
+        self._add_tooltip_for_widget(self.regex_time_budget_entry, "Tempo máximo (em segundos) para avaliar o Regex em nomes de amostra antes de renomear. Padrões mais lentos são bloqueados. Use 0 para desativar a verificação.")
+        self._add_tooltip_for_widget(self.test_regex_button, "Avalia o Regex em nomes de amostra da pasta selecionada e mostra quanto tempo ele leva.")
         self._add_tooltip_for_widget(self.case_option_menu, "Converte o nome do arquivo para maiúsculas, minúsculas ou capitaliza a primeira letra.")
         self._add_tooltip_for_widget(self.space_option_menu, "Gerencia espaços no nome do arquivo: remove todos ou substitui por sublinhados.")
         self._add_tooltip_for_widget(self.use_custom_date_cb, "Ativar esta opção para usar uma data personalizada no nome do arquivo. Utilize o placeholder {date} no padrão de nome final.")
@@ -184,6 +1505,11 @@ class FileRenamerApp:
         self._add_tooltip_for_widget(self.ignore_ext_case_cb, "Considera 'JPG' e 'jpg' a mesma extensão ao gerar o novo nome.")
         self._add_tooltip_for_widget(self.overwrite_conflict_cb, "Se o novo nome já existir, o arquivo antigo será sobrescrito. Use com cautela!")
         self._add_tooltip_for_widget(self.add_increment_on_conflict_cb, "Se o novo nome já existir, adiciona um sufixo '(1)', '(2)' ao arquivo (ex: 'foto (1).jpg').")
+        self._add_tooltip_for_widget(self.preset_combobox, "Selecione um preset salvo para aplicar instantaneamente todas as suas opções.")
+        self._add_tooltip_for_widget(self.save_preset_button, "Salva as opções atuais como um preset com nome.")
+        self._add_tooltip_for_widget(self.delete_preset_button, "Exclui o preset selecionado.")
+        self._add_tooltip_for_widget(self.export_plan_button, "Salva o plano da última prévia em CSV ou JSON Lines (old_path, new_path, conflict, action) para revisão ou edição.")
+        self._add_tooltip_for_widget(self.import_plan_button, "Carrega um plano CSV/JSON Lines editado, verifica conflitos com as opções atuais e aplica as renomeações.")
 
     def setup_general_tab(self, tab):
         frame = ttk.LabelFrame(tab, text="Configurações Básicas")
@@ -229,13 +1555,13 @@ class FileRenamerApp:
         self.custom_date_entry.bind("<FocusOut>", self.validate_date_input)
 
         ttk.Label(date_options_frame, text="Entrada:").pack(side="left", padx=(0,5))
-        self.date_input_format_menu = tk.OptionMenu(date_options_frame, self.date_input_format_option, "YYYYMMDD", "YYYY-MM-DD", "DDMMYYYY", "DD-MM-YYYY")
+        self.date_input_format_menu = tk.OptionMenu(date_options_frame, self.date_input_format_option, *DATE_FORMATS)
         self.date_input_format_menu.pack(side="left")
         self.date_input_format_menu.config(font=('Segoe UI', 9), bg='white', fg='#333333', activebackground=self.light_gray, activeforeground='#333333', relief='flat', borderwidth=1)
         self.date_input_format_option.trace_add("write", lambda *args: self.update_date_format_labels())
 
         ttk.Label(date_options_frame, text="Saída:").pack(side="left", padx=(10,5))
-        self.date_output_format_menu = tk.OptionMenu(date_options_frame, self.date_output_format_option, "YYYYMMDD", "YYYY-MM-DD", "DDMMYYYY", "DD-MM-YYYY")
+        self.date_output_format_menu = tk.OptionMenu(date_options_frame, self.date_output_format_option, *DATE_FORMATS)
         self.date_output_format_menu.pack(side="left")
         self.date_output_format_menu.config(font=('Segoe UI', 9), bg='white', fg='#333333', activebackground=self.light_gray, activeforeground='#333333', relief='flat', borderwidth=1)
 
@@ -293,14 +1619,7 @@ class FileRenamerApp:
         date_str = self.custom_date_var.get()
         input_format_key = self.date_input_format_option.get()
 
-        format_map = {
-            "YYYYMMDD": "%Y%m%d",
-            "YYYY-MM-DD": "%Y-%m-%d",
-            "DDMMYYYY": "%d%m%Y",
-            "DD-MM-YYYY": "%d-%m-%Y"
-        }
-        
-        python_format = format_map.get(input_format_key)
+        python_format = DATE_FORMAT_MAP.get(input_format_key)
 
         if not python_format:
             self.log(f"Erro de Validação: Formato de entrada de data '{input_format_key}' inválido.")
@@ -333,17 +1652,24 @@ class FileRenamerApp:
         self.replace_new_entry.grid(row=1, column=3, sticky="ew", pady=5, padx=5)
 
         ttk.Label(frame, text="2. Remover Padrão (Regex):").grid(row=2, column=0, sticky="w", pady=10, padx=10)
+        regex_options_frame = ttk.Frame(frame, style='TFrame')
+        regex_options_frame.grid(row=2, column=1, columnspan=3, sticky="e", padx=10)
+        ttk.Label(regex_options_frame, text="Tempo máx. (s):").pack(side="left", padx=(0,5))
+        self.regex_time_budget_entry = ttk.Entry(regex_options_frame, textvariable=self.regex_time_budget_var, width=5)
+        self.regex_time_budget_entry.pack(side="left", padx=(0,10))
+        self.test_regex_button = ttk.Button(regex_options_frame, text="⏱️ Testar Regex", command=self.test_remove_pattern, style='Secondary.TButton')
+        self.test_regex_button.pack(side="left")
         self.remove_pattern_entry = ttk.Entry(frame, textvariable=self.remove_pattern_var)
         self.remove_pattern_entry.grid(row=3, column=0, columnspan=4, sticky="ew", padx=10, pady=5)
         ttk.Label(frame, text="Ex: `\\(.*?\\)` (remove texto entre parênteses) | `\\d{4}` (remove números de 4 dígitos)").grid(row=4, column=0, columnspan=4, sticky="w", padx=10, pady=5)
 
         ttk.Label(frame, text="3. Converter Case:").grid(row=5, column=0, sticky="w", pady=10, padx=10)
-        self.case_option_menu = tk.OptionMenu(frame, self.case_option, "Manter", "Maiúsculas", "Minúsculas", "Capitalizar")
+        self.case_option_menu = tk.OptionMenu(frame, self.case_option, *CASE_OPTIONS)
         self.case_option_menu.grid(row=5, column=1, sticky="ew", pady=5, padx=5)
         self.case_option_menu.config(font=('Segoe UI', 10), bg='white', fg='#333333', activebackground=self.light_gray, activeforeground='#333333', relief='flat', borderwidth=1)
 
         ttk.Label(frame, text="4. Gerenciar Espaços:").grid(row=6, column=0, sticky="w", pady=10, padx=10)
-        self.space_option_menu = tk.OptionMenu(frame, self.space_option, "Manter", "Remover Todos", "Substituir por '_'")
+        self.space_option_menu = tk.OptionMenu(frame, self.space_option, *SPACE_OPTIONS)
         self.space_option_menu.grid(row=6, column=1, sticky="ew", pady=5, padx=5)
         self.space_option_menu.config(font=('Segoe UI', 10), bg='white', fg='#333333', activebackground=self.light_gray, activeforeground='#333333', relief='flat', borderwidth=1)
 
@@ -367,6 +1693,17 @@ class FileRenamerApp:
         ttk.Label(frame, text="3. Restrições de Nome de Arquivo:").grid(row=5, column=0, sticky="w", pady=10, padx=10)
         ttk.Label(frame, text='Caracteres que serão removidos automaticamente: / \\ : * ? " < > |').grid(row=6, column=0, columnspan=2, sticky="w", padx=10)
 
+        ttk.Label(frame, text="4. Predefinições (Presets):").grid(row=7, column=0, sticky="w", pady=10, padx=10)
+        preset_frame = ttk.Frame(frame, style='TFrame')
+        preset_frame.grid(row=8, column=0, columnspan=2, sticky="w", padx=10)
+        self.preset_combobox = ttk.Combobox(preset_frame, textvariable=self.preset_var, state="readonly", width=30)
+        self.preset_combobox.pack(side="left", padx=(0,10))
+        self.preset_combobox.bind("<<ComboboxSelected>>", self.on_preset_selected)
+        self.save_preset_button = ttk.Button(preset_frame, text="💾 Salvar Preset...", command=self.save_preset, style='Secondary.TButton')
+        self.save_preset_button.pack(side="left", padx=(0,5))
+        self.delete_preset_button = ttk.Button(preset_frame, text="🗑️ Excluir Preset", command=self.delete_preset, style='Secondary.TButton')
+        self.delete_preset_button.pack(side="left")
+
     def setup_instructions_tab(self, tab):
         instructions_frame = ttk.Frame(tab, style='TFrame')
         instructions_frame.pack(pady=20, padx=20, fill="both", expand=True)
@@ -464,130 +1801,48 @@ Bem-vindo(a) ao **NameFluxer**, sua ferramenta inteligente para renomear arquivo
             self.directory_path.set(directory)
             self.log("Diretório selecionado: " + directory)
 
-    def log(self, message):
-        self.log_text.config(state='normal')
-        self.log_text.insert(tk.END, message + "\n")
-        self.log_text.see(tk.END)
-        self.log_text.config(state='disabled')
-
-    def sanitize_filename(self, filename):
-        invalid_chars = r'[\\/:*?"<>|]'
-        return re.sub(invalid_chars, '', filename)
-
-    def generate_new_filename(self, original_name_no_ext, original_ext, sequence_num=None):
-        pattern = self.output_pattern_var.get()
-        new_name_no_ext_processed = original_name_no_ext
-
-        old_text = self.replace_old_var.get()
-        new_text = self.replace_new_var.get()
-        if old_text:
-            new_name_no_ext_processed = new_name_no_ext_processed.replace(old_text, new_text)
-
-        pattern_to_remove = self.remove_pattern_var.get()
-        if pattern_to_remove:
-            try:
-                new_name_no_ext_processed = re.sub(pattern_to_remove, '', new_name_no_ext_processed)
-            except re.error:
-                self.log(f"Aviso: Padrão Regex inválido '{pattern_to_remove}'. Ignorando.")
-
-        space_option = self.space_option.get()
-        if space_option == "Remover Todos":
-            new_name_no_ext_processed = new_name_no_ext_processed.replace(" ", "")
-        elif space_option == "Substituir por '_'":
-            new_name_no_ext_processed = new_name_no_ext_processed.replace(" ", "_")
-
-        case_option = self.case_option.get()
-        if case_option == "Maiúsculas":
-            new_name_no_ext_processed = new_name_no_ext_processed.upper()
-        elif case_option == "Minúsculas":
-            new_name_no_ext_processed = new_name_no_ext_processed.lower()
-        elif case_option == "Capitalizar":
-            new_name_no_ext_processed = new_name_no_ext_processed.capitalize()
-
-        formatted_sequence = ""
-        if sequence_num is not None:
-            try:
-                digits = self.digits_var.get()
-                if digits > 0:
-                    formatted_sequence = f"{sequence_num:0{digits}d}"
-                else:
-                    formatted_sequence = str(sequence_num)
-            except Exception:
-                formatted_sequence = str(sequence_num)
-
-        formatted_date = ""
-        if self.use_custom_date_var.get():
-            date_str = self.custom_date_var.get()
-            input_format_key = self.date_input_format_option.get()
-            output_format_key = self.date_output_format_option.get()
-
-            format_map = {
-                "YYYYMMDD": "%Y%m%d",
-                "YYYY-MM-DD": "%Y-%m-%d",
-                "DDMMYYYY": "%d%m%Y",
-                "DD-MM-YYYY": "%d-%m-%Y"
-            }
-
-            input_python_format = format_map.get(input_format_key)
-            output_python_format = format_map.get(output_format_key)
-
-            if not input_python_format or not output_python_format:
-                self.log(f"Erro interno: Formato de data inválido. Placeholder {{date}} será ignorado.")
-                formatted_date = ""
-            else:
-                try:
-                    dt_obj = datetime.strptime(date_str, input_python_format)
-                    formatted_date = dt_obj.strftime(output_python_format)
-                except ValueError:
-                    self.log(f"Aviso: Data '{date_str}' não corresponde ao formato de entrada '{input_python_format}'. O placeholder {{date}} será ignorado ou aparecerá vazio.")
-                    formatted_date = ""
-                except Exception as e:
-                    self.log(f"Erro inesperado ao processar data: {e}. O placeholder {{date}} será ignorado.")
-                    formatted_date = ""
-
-        processed_pattern = pattern
-
-        if self.sequential_var.get() and "{sequence}" not in processed_pattern:
-            if "{ext}" in processed_pattern:
-                ext_pos = processed_pattern.rfind("{ext}")
-                processed_pattern = processed_pattern[:ext_pos] + "_{sequence}" + processed_pattern[ext_pos:]
-            else:
-                processed_pattern += "_{sequence}"
-
-        if self.use_custom_date_var.get() and "{date}" not in processed_pattern:
-            if "{ext}" in processed_pattern:
-                ext_pos = processed_pattern.rfind("{ext}")
-                if "{sequence}" in processed_pattern:
-                    seq_pos = processed_pattern.rfind("{sequence}")
-                    if seq_pos < ext_pos:
-                        insert_at = seq_pos + len("{sequence}")
-                        processed_pattern = processed_pattern[:insert_at] + "_{date}" + processed_pattern[insert_at:]
-                    else:
-                        processed_pattern = processed_pattern[:ext_pos] + "_{date}" + processed_pattern[ext_pos:]
-                else:
-                    processed_pattern = processed_pattern[:ext_pos] + "_{date}" + processed_pattern[ext_pos:]
-            else:
-                processed_pattern += "_{date}"
+    def log(self, message, level=logging.INFO):
+        logger.log(level, message)
+        self.flush_log()
+        self.append_log([message])
 
-        final_name_parts = {
-            "{original_name}": new_name_no_ext_processed,
-            "{sequence}": formatted_sequence,
-            "{date}": formatted_date,
-            "{ext}": original_ext.lower() if self.ignore_ext_case_var.get() else original_ext
-        }
+    def log_detail(self, message):
+        logger.debug(message)
+        with self.log_lock:
+            self.pending_log.append(message)
+            self.pending_log_count += 1
 
-        new_full_name_base = processed_pattern
-        for placeholder, value in final_name_parts.items():
-            new_full_name_base = new_full_name_base.replace(placeholder, str(value))
+    def flush_log(self):
+        with self.log_lock:
+            if not self.pending_log_count:
+                return
+            messages = list(self.pending_log)
+            dropped = self.pending_log_count - len(messages)
+            self.pending_log.clear()
+            self.pending_log_count = 0
+        self.append_log(messages, dropped)
 
-        new_full_name_base = self.sanitize_filename(new_full_name_base)
+    def append_log(self, messages, dropped=0):
+        self.log_text.config(state='normal')
+        self.log_text.insert(tk.END, "\n".join(messages) + "\n")
+        excess = int(self.log_text.index('end-1c').split('.')[0]) - 1 - LOG_VIEW_MAX_LINES
+        if (excess > 0 or dropped) and not self.log_truncated:
+            self.log_truncated = True
+            self.log_text.insert('1.0', f"[Exibindo apenas as últimas {LOG_VIEW_MAX_LINES} linhas. Use 'Exportar Plano...' após a prévia para a lista completa.]\n")
+            excess += 1
+        if excess > 0:
+            self.log_text.delete('2.0', f'{excess + 2}.0')
+        self.log_text.see(tk.END)
+        self.log_text.config(state='disabled')
 
-        return new_full_name_base
+    def clear_log(self):
+        self.log_truncated = False
+        self.log_text.config(state='normal')
+        self.log_text.delete(1.0, tk.END)
+        self.log_text.config(state='disabled')
 
     def run_renamer(self, preview):
         directory = self.directory_path.get()
-        sequential = self.sequential_var.get()
-        start_num = self.start_num_var.get()
         recursive = self.recursive_var.get()
 
         if self.use_custom_date_var.get() and not self.validate_date_input():
@@ -598,9 +1853,7 @@ Bem-vindo(a) ao **NameFluxer**, sua ferramenta inteligente para renomear arquivo
             self.log("Operação cancelada devido a valores numéricos inválidos.")
             return
 
-        self.log_text.config(state='normal')
-        self.log_text.delete(1.0, tk.END)
-        self.log_text.config(state='disabled')
+        self.clear_log()
 
         if not directory:
             messagebox.showerror("Erro", "Por favor, selecione um diretório.")
@@ -613,31 +1866,14 @@ Bem-vindo(a) ao **NameFluxer**, sua ferramenta inteligente para renomear arquivo
              self.log("Erro: Padrão de saída vazio.")
              return
 
-        has_transformation = any([
-            self.replace_old_var.get(),
-            self.replace_new_var.get(),
-            self.remove_pattern_var.get(),
-            self.case_option.get() != "Manter",
-            self.space_option.get() != "Manter",
-            self.sequential_var.get(),
-            self.use_custom_date_var.get(),
-            output_pattern.lower() not in ["{original_name}.{ext}", "{original_name}{ext}"]
-        ])
-
-        if not has_transformation:
+        planner = self.create_planner()
+        if not planner.has_transformation():
             messagebox.showinfo("Informação", "Nenhuma opção de transformação foi selecionada e o padrão de nome final não altera o nome base. Nenhuma alteração será feita nos nomes dos arquivos.")
             self.log("Nenhuma transformação especificada. Arquivos não serão alterados.")
             return
 
-        if self.overwrite_conflict_var.get() and not preview:
-            response = messagebox.askyesno(
-                "CONFIRMAR SOBRESCRITA",
-                "Você ativou a opção de SOBRESCRITA. Arquivos com nomes idênticos SERÃO PERDIDOS. Deseja continuar?",
-                icon='warning'
-            )
-            if not response:
-                self.log("Operação cancelada pelo usuário devido à opção de sobrescrita.")
-                return
+        if not preview and not self.confirm_overwrite():
+            return
 
         self.log(f"Iniciando {'prévia' if preview else 'renomeação'}...")
         self.log(f"Diretório: {directory}")
@@ -645,105 +1881,258 @@ Bem-vindo(a) ao **NameFluxer**, sua ferramenta inteligente para renomear arquivo
         self.log(f"Recursivo: {'Sim' if recursive else 'Não'}")
         self.log("-" * 40)
 
-        files_info = []
         if not os.path.isdir(directory):
             self.log(f"Erro: O diretório '{directory}' não existe ou não é válido.")
             messagebox.showerror("Erro", f"O diretório '{directory}' não existe ou não é válido.")
             return
 
-        for root, _, files in os.walk(directory):
-            for filename in files:
-                full_path_old = os.path.join(root, filename)
-                name, ext = os.path.splitext(filename)
-                files_info.append((full_path_old, name, ext))
-            if not recursive:
-                break
-
-        if not files_info:
-            self.log("Nenhum arquivo encontrado para renomear.")
-            messagebox.showinfo("Informação", "Nenhum arquivo encontrado no diretório especificado.")
+        if not self.check_remove_pattern(planner, directory):
+            self.log("Operação cancelada devido ao padrão Regex.")
             return
 
-        counter = start_num
-        renamed_map_preview = {}
-        results_list = []
-        renamed_count = 0
+        plan = RenamePlan()
+        expected_count = self.settings.scan_count(directory, recursive)
 
-        for old_path, original_name_no_ext, original_ext in files_info:
-            new_basename_base = self.generate_new_filename(
-                original_name_no_ext, original_ext, counter if sequential else None
-            )
+        def work():
+            scanned_count = planner.build_plan(plan, directory, expected_count)
+            renamed_count = planner.execute_plan(plan, preview) if len(plan) else 0
+            return scanned_count, renamed_count
 
-            if sequential:
-                counter += 1
-
-            new_path_candidate = os.path.join(os.path.dirname(old_path), new_basename_base)
-
-            final_new_path = new_path_candidate
-            conflict_type = None
-
-            if new_path_candidate in renamed_map_preview and renamed_map_preview[new_path_candidate] != old_path:
-                conflict_type = "interno"
-                self.log(f"Conflito INTERNO detectado para '{os.path.basename(old_path)}': outro arquivo ('{os.path.basename(renamed_map_preview[new_path_candidate])}') também renomeia para '{os.path.basename(new_path_candidate)}'.")
-            elif os.path.exists(new_path_candidate) and new_path_candidate != old_path:
-                conflict_type = "existente"
-                self.log(f"Conflito com ARQUIVO EXISTENTE no disco para '{os.path.basename(old_path)}': '{os.path.basename(new_path_candidate)}' já existe.")
-
-            if conflict_type:
-                if self.overwrite_conflict_var.get():
-                    self.log(f" -> Sobrescrevendo o arquivo existente em '{os.path.basename(new_path_candidate)}' (opção ativada).")
-                elif self.add_increment_on_conflict_var.get():
-                    increment = 1
-                    original_name_no_ext_candidate, original_ext_candidate = os.path.splitext(new_basename_base)
-                    while True:
-                        temp_new_name = f"{original_name_no_ext_candidate} ({increment}){original_ext_candidate}"
-                        temp_new_path = os.path.join(os.path.dirname(old_path), temp_new_name)
-                        if not os.path.exists(temp_new_path) and temp_new_path not in renamed_map_preview:
-                            final_new_path = temp_new_path
-                            self.log(f" -> Conflito resolvido com incremento: '{os.path.basename(final_new_path)}'")
-                            break
-                        increment += 1
-                else:
-                    self.log(f" -> Sem opção de resolução de conflito. Ignorando renomeação de '{os.path.basename(old_path)}'.")
-                    continue
+        def done(result, error):
+            try:
+                if error is not None:
+                    self.report_task_error(error)
+                    return
+                scanned_count, renamed_count = result
+                self.settings.set_scan_count(directory, recursive, scanned_count)
+
+                if not scanned_count:
+                    self.log("Nenhum arquivo encontrado para renomear.")
+                    messagebox.showinfo("Informação", "Nenhum arquivo encontrado no diretório especificado.")
+                    return
+
+                if not len(plan):
+                    self.log("Nenhuma renomeação válida será realizada com as opções atuais.")
+                    messagebox.showinfo("Informação", "Nenhum arquivo será renomeado com as opções atuais.")
+                    return
+
+                self.show_summary(planner, plan, preview, renamed_count, scanned_count)
+            finally:
+                self.set_last_plan(plan if preview and error is None else None)
+                if not preview or error is not None:
+                    plan.close()
+
+        self.run_task(work, done)
+
+    def check_remove_pattern(self, planner, directory, show_timing=False):
+        pattern = planner.options["remove_pattern"]
+        if not pattern:
+            return True
 
-            if old_path == final_new_path:
-                self.log(f"Ignorando '{os.path.basename(old_path)}': Nome inalterado após todas as transformações.")
-                continue
+        if planner.remove_pattern_error is not None:
+            self.log(f"Erro: Padrão Regex inválido '{pattern}': {planner.remove_pattern_error}.")
+            messagebox.showerror("Regex Inválido", f"O padrão Regex '{pattern}' é inválido: {planner.remove_pattern_error}.")
+            return False
 
-            renamed_map_preview[final_new_path] = old_path
+        time_budget = planner.options["regex_time_budget"]
+        if not time_budget:
+            if not show_timing:
+                return True
+            time_budget = REGEX_TIME_BUDGET
+
+        elapsed, sample_count = planner.probe_remove_pattern(directory, time_budget)
+        if not sample_count:
+            self.log(f"Regex '{pattern}' não foi avaliado: nenhum nome de amostra disponível.")
+            if show_timing:
+                messagebox.showinfo("Teste de Regex", "Não há nomes de arquivo para testar o padrão. Selecione uma pasta que contenha arquivos e tente novamente.")
+            return True
+        if elapsed is None:
+            self.log(f"Erro: O padrão Regex '{pattern}' excedeu o limite de {time_budget:.1f}s em {sample_count} nomes de amostra (possível backtracking catastrófico).")
+            messagebox.showerror("Regex Muito Lento", f"O padrão Regex '{pattern}' levou mais de {time_budget:.1f}s para {sample_count} nomes de amostra e pode travar o programa. Simplifique o padrão (evite quantificadores aninhados como '(a+)+') ou aumente o tempo máximo.")
+            return False
 
-            results_list.append((old_path, final_new_path))
+        self.log(f"Regex '{pattern}' avaliado em {elapsed * 1000:.1f} ms para {sample_count} nomes de amostra (limite: {time_budget:.1f}s).")
+        if show_timing:
+            messagebox.showinfo("Teste de Regex", f"O padrão Regex '{pattern}' levou {elapsed * 1000:.1f} ms para {sample_count} nomes de amostra ({elapsed / sample_count * 1e6:.1f} µs por nome).")
+        return True
 
-        if not results_list:
-            self.log("Nenhuma renomeação válida será realizada com as opções atuais.")
-            messagebox.showinfo("Informação", "Nenhum arquivo será renomeado com as opções atuais.")
+    def test_remove_pattern(self):
+        if not self.remove_pattern_var.get():
+            messagebox.showinfo("Teste de Regex", "Digite um padrão Regex para testar.")
             return
+        self.check_remove_pattern(self.create_planner(), self.directory_path.get(), show_timing=True)
 
-        for old_path, new_path in results_list:
-            self.log(f"'{os.path.basename(old_path)}' -> '{os.path.basename(new_path)}'")
-            if not preview:
-                try:
-                    os.rename(old_path, new_path)
-                    renamed_count += 1
-                except OSError as e:
-                    self.log(f"Erro ao renomear '{os.path.basename(old_path)}' para '{os.path.basename(new_path)}': {e}")
-                except Exception as e:
-                    self.log(f"Ocorreu um erro inesperado ao renomear '{os.path.basename(old_path)}': {e}")
+    def confirm_overwrite(self):
+        if self.overwrite_conflict_var.get():
+            response = messagebox.askyesno(
+                "CONFIRMAR SOBRESCRITA",
+                "Você ativou a opção de SOBRESCRITA. Arquivos com nomes idênticos SERÃO PERDIDOS. Deseja continuar?",
+                icon='warning'
+            )
+            if not response:
+                self.log("Operação cancelada pelo usuário devido à opção de sobrescrita.")
+                return False
+        return True
+
+    def set_last_plan(self, plan):
+        last_plan = getattr(self, 'last_plan', None)
+        if last_plan is not None and last_plan is not plan:
+            last_plan.close()
+        self.last_plan = plan
+
+    def create_planner(self):
+        progress = ProgressTracker()
+        progress.add_listener(self.update_progress)
+        progress.add_listener(log_progress, PROGRESS_LOG_INTERVAL)
+        return RenamePlanner(self.collect_options(), log=self.log_detail, progress=progress)
+
+    def input_widgets(self):
+        stack = [self.master]
+        while stack:
+            widget = stack.pop()
+            stack.extend(widget.winfo_children())
+            if isinstance(widget, (ttk.Button, ttk.Entry, ttk.Checkbutton)):
+                yield widget
+
+    def set_busy(self, busy):
+        self.busy = busy
+        if busy:
+            self.busy_states = [(widget, widget.state(['disabled'])) for widget in self.input_widgets()]
+        else:
+            for widget, previous_state in self.busy_states:
+                widget.state(previous_state)
+            self.busy_states = []
+
+    def run_task(self, work, done):
+        outcome = {}
+
+        def target():
+            try:
+                outcome["result"] = work()
+            except Exception as e:
+                outcome["error"] = e
+
+        self.set_busy(True)
+        worker = threading.Thread(target=target, daemon=True)
+        worker.start()
+        self.master.after(PROGRESS_POLL_MS, self.poll_task, worker, outcome, done)
+
+    def poll_task(self, worker, outcome, done):
+        self.flush_log()
+        self.show_progress()
+        if worker.is_alive():
+            self.master.after(PROGRESS_POLL_MS, self.poll_task, worker, outcome, done)
+            return
+        self.set_busy(False)
+        done(outcome.get("result"), outcome.get("error"))
+
+    def report_task_error(self, error):
+        self.log(f"Ocorreu um erro inesperado: {error}")
+        messagebox.showerror("Erro", f"Ocorreu um erro inesperado: {error}")
+
+    def update_progress(self, tracker):
+        self.progress_state = (tracker.fraction, tracker.status_line())
 
+    def show_progress(self):
+        progress_state, self.progress_state = self.progress_state, None
+        if progress_state is None:
+            return
+        fraction, status_line = progress_state
+        if fraction is None:
+            self.progress_bar.config(mode='indeterminate')
+            self.progress_bar.step(5)
+        else:
+            self.progress_bar.config(mode='determinate', value=fraction * 100)
+        self.progress_status_var.set(status_line)
+
+    def show_summary(self, planner, plan, preview, renamed_count, processed_count):
         self.log("-" * 40)
+        self.log(planner.progress.status_line())
         if preview:
             self.log("Modo de prévia ativado. Nenhum arquivo foi realmente renomeado.")
-            self.log(f"Total de arquivos que seriam afetados: {len(results_list)}")
-            messagebox.showinfo("Prévia Concluída", f"Prévia gerada com sucesso. Total de arquivos a serem renomeados: {len(results_list)}. Verifique o log abaixo.")
+            self.log(f"Total de arquivos que seriam afetados: {len(plan)}")
+            messagebox.showinfo("Prévia Concluída", f"Prévia gerada com sucesso. Total de arquivos a serem renomeados: {len(plan)}. Verifique o log abaixo.")
         else:
             self.log(f"Renomeação concluída. Total de arquivos renomeados: {renamed_count}")
-            self.log(f"Total de arquivos processados (incluindo ignorados/conflitos): {len(files_info)}")
+            self.log(f"Total de arquivos processados (incluindo ignorados/conflitos): {processed_count}")
             messagebox.showinfo("Renomeação Concluída", f"Operação finalizada. Total de arquivos renomeados: {renamed_count}.")
 
+    def export_plan_dialog(self):
+        plan = getattr(self, 'last_plan', None)
+        if plan is None or not len(plan):
+            messagebox.showinfo("Informação", "Gere uma prévia com pelo menos uma renomeação antes de exportar o plano.")
+            return
+        path = filedialog.asksaveasfilename(
+            title="Exportar Plano de Renomeação",
+            defaultextension=".csv",
+            filetypes=[("CSV", "*.csv"), ("JSON Lines", "*.jsonl"), ("JSON", "*.json"), ("Todos os arquivos", "*.*")]
+        )
+        if not path:
+            return
+        try:
+            count = export_plan(plan, path)
+        except OSError as e:
+            self.log(f"Erro ao exportar o plano para '{path}': {e}")
+            messagebox.showerror("Erro", f"Não foi possível exportar o plano: {e}")
+            return
+        self.log(f"Plano exportado para '{path}' ({count} entradas).")
+        messagebox.showinfo("Plano Exportado", f"Plano exportado com sucesso: {count} entradas.")
+
+    def import_plan_dialog(self):
+        path = filedialog.askopenfilename(
+            title="Importar Plano de Renomeação",
+            filetypes=[("CSV", "*.csv"), ("JSON Lines", "*.jsonl"), ("JSON", "*.json"), ("Todos os arquivos", "*.*")]
+        )
+        if not path:
+            return
+
+        self.clear_log()
+        self.log(f"Importando plano de '{path}'...")
+        self.log("-" * 40)
+
+        planner = self.create_planner()
+        plan = RenamePlan(track_sources=True)
+
+        def imported(row_count, error):
+            if error is not None:
+                plan.close()
+                if isinstance(error, (OSError, ValueError, csv.Error)):
+                    self.log(f"Erro ao importar o plano: {error}")
+                    messagebox.showerror("Erro", f"Não foi possível importar o plano: {error}")
+                else:
+                    self.report_task_error(error)
+                return
+
+            if not len(plan):
+                plan.close()
+                self.log("Nenhuma renomeação válida encontrada no plano importado.")
+                messagebox.showinfo("Informação", "Nenhuma renomeação válida encontrada no plano importado.")
+                return
+
+            self.log(f"Plano importado: {len(plan)} de {row_count} entradas serão aplicadas.")
+            if not messagebox.askyesno("Aplicar Plano", f"{len(plan)} arquivos serão renomeados conforme o plano importado. Deseja aplicar agora?"):
+                self.log("Aplicação do plano importado cancelada pelo usuário.")
+                self.set_last_plan(plan)
+                return
+            if not self.confirm_overwrite():
+                plan.close()
+                return
+
+            def applied(renamed_count, error):
+                try:
+                    if error is not None:
+                        self.report_task_error(error)
+                        return
+                    self.show_summary(planner, plan, False, renamed_count, row_count)
+                finally:
+                    plan.close()
+
+            self.run_task(lambda: planner.execute_plan(plan), applied)
+
+        self.run_task(lambda: planner.build_plan_from_file(plan, path), imported)
+
     def show_welcome_message(self):
-        settings = self.load_settings()
-        if not settings.get("dont_show_welcome_again", False):
+        if not self.settings.get("dont_show_welcome_again", False):
             welcome_window = tk.Toplevel(self.master)
             welcome_window.title("Bem-vindo ao NameFluxer!")
             welcome_window.transient(self.master)
@@ -774,8 +2163,8 @@ Bem-vindo(a) ao **NameFluxer**, sua ferramenta inteligente para renomear arquivo
             ttk.Checkbutton(message_frame, text="Não mostrar esta mensagem novamente", variable=dont_show_var).pack(pady=10)
 
             def close_welcome():
-                settings["dont_show_welcome_again"] = dont_show_var.get()
-                self.save_settings(settings)
+                self.settings.set("dont_show_welcome_again", dont_show_var.get())
+                self.save_settings()
                 welcome_window.destroy()
 
             ttk.Button(message_frame, text="Entendi!", command=close_welcome, style='Accent.TButton').pack(pady=10)
@@ -784,19 +2173,206 @@ Bem-vindo(a) ao **NameFluxer**, sua ferramenta inteligente para renomear arquivo
             self.master.wait_window(welcome_window)
 
     def load_settings(self):
-        if os.path.exists(SETTINGS_FILE):
+        if self.settings.load_error:
+            self.log(f"Aviso: {self.settings.load_error}")
+            messagebox.showwarning("Configurações Corrompidas", self.settings.load_error)
+        self.apply_options(self.settings.options)
+        self.refresh_presets()
+        self.preset_var.set(self.settings.get("active_preset", ""))
+        for var in self.option_vars.values():
+            var.trace_add("write", self.on_option_changed)
+
+    def save_settings(self):
+        return self.settings.flush()
+
+    def collect_options(self):
+        options = self.settings.options
+        for key, var in self.option_vars.items():
+            try:
+                options[key] = var.get()
+            except tk.TclError:
+                pass
+        return options
+
+    def apply_options(self, options):
+        self._applying_options = True
+        try:
+            for key, value in validate_options(options).items():
+                self.option_vars[key].set(value)
+        finally:
+            self._applying_options = False
+        self.update_date_format_labels()
+
+    def on_option_changed(self, *args):
+        if self._applying_options:
+            return
+        self.settings.update_options(self.collect_options())
+
+    def refresh_presets(self):
+        self.preset_combobox.config(values=self.settings.preset_names())
+
+    def on_preset_selected(self, event=None):
+        name = self.preset_var.get()
+        options = self.settings.preset(name)
+        if options is None:
+            return
+        self.apply_options(options)
+        self.settings.update_options(options)
+        self.settings.set("active_preset", name)
+        self.log(f"Preset '{name}' aplicado.")
+
+    def save_preset(self):
+        name = simpledialog.askstring("Salvar Preset", "Nome do preset:", initialvalue=self.preset_var.get(), parent=self.master)
+        if name is None:
+            return
+        name = name.strip()
+        if not name:
+            messagebox.showwarning("Nome Inválido", "O nome do preset não pode ser vazio.")
+            return
+        if self.settings.preset(name) is not None and not messagebox.askyesno("Substituir Preset", f"O preset '{name}' já existe. Deseja substituí-lo?"):
+            return
+        self.settings.save_preset(name, self.collect_options())
+        self.refresh_presets()
+        self.preset_var.set(name)
+        self.log(f"Preset '{name}' salvo.")
+
+    def delete_preset(self):
+        name = self.preset_var.get()
+        if not name:
+            messagebox.showinfo("Informação", "Selecione um preset para excluir.")
+            return
+        if not messagebox.askyesno("Excluir Preset", f"Deseja excluir o preset '{name}'?"):
+            return
+        if self.settings.delete_preset(name):
+            self.refresh_presets()
+            self.preset_var.set("")
+            self.log(f"Preset '{name}' excluído.")
+
+    def on_close(self):
+        if self.busy:
+            self.log("Aguarde o término da operação atual antes de fechar o programa.")
+            return
+        self.set_last_plan(None)
+        if not self.save_settings():
+            self.log(f"Aviso: não foi possível salvar as configurações em '{self.settings.path}'.")
+        self.master.destroy()
+
+def _print_progress(tracker):
+    sys.stderr.write("\r" + tracker.status_line().ljust(110))
+    if tracker.phase_finished:
+        sys.stderr.write("\n")
+    sys.stderr.flush()
+
+
+def _print_finished_phase(tracker):
+    if tracker.phase_finished:
+        print(tracker.status_line())
+
+
+def run_cli(argv=None):
+    parser = argparse.ArgumentParser(
+        prog=f"{APP_NAME} --cli",
+        description="Renomeia arquivos sem abrir a interface gráfica, usando as opções salvas ou um preset."
+    )
+    parser.add_argument("directory", nargs="?", help="pasta com os arquivos (padrão: a última pasta usada na interface)")
+    parser.add_argument("--preset", help="nome de um preset salvo a ser usado no lugar das opções atuais")
+    parser.add_argument("--pattern", help="padrão de nome final, ex: 'Foto_{sequence}{ext}'")
+    parser.add_argument("--recursive", action="store_true", help="incluir arquivos em subpastas")
+    parser.add_argument("--import", dest="import_path", metavar="ARQUIVO", help="usar um plano CSV/JSON Lines em vez de varrer a pasta")
+    parser.add_argument("--export", metavar="ARQUIVO", help="salvar o plano em CSV/JSON Lines")
+    parser.add_argument("--apply", action="store_true", help="renomear de fato (sem esta opção apenas uma prévia é gerada)")
+    parser.add_argument("--overwrite", action="store_true", help="confirmar --apply quando a opção de sobrescrita estiver ativada (arquivos existentes SERÃO PERDIDOS)")
+    parser.add_argument("--log-file", metavar="ARQUIVO", help=f"arquivo de log (padrão: {LOG_FILE} na pasta de configuração)")
+    parser.add_argument("--quiet", action="store_true", help="não listar cada renomeação no terminal, apenas a linha de progresso")
+    args = parser.parse_args(argv)
+
+    settings = SettingsStore()
+    if settings.load_error:
+        print(f"Aviso: {settings.load_error}", file=sys.stderr)
+    options = settings.options
+    if args.preset:
+        options = settings.preset(args.preset)
+        if options is None:
+            parser.error(f"preset '{args.preset}' não encontrado.")
+    if args.directory:
+        options["directory"] = args.directory
+    if args.pattern is not None:
+        options["output_pattern"] = args.pattern
+    if args.recursive:
+        options["recursive"] = True
+
+    setup_file_logging(args.log_file)
+
+    def log(message, level=logging.INFO):
+        logger.log(level, message)
+        if not args.quiet:
+            print(message)
+
+    def log_detail(message):
+        log(message, logging.DEBUG)
+
+    progress = ProgressTracker()
+    progress.add_listener(_print_progress if args.quiet else _print_finished_phase)
+    progress.add_listener(log_progress, PROGRESS_LOG_INTERVAL)
+    planner = RenamePlanner(options, log=log_detail, progress=progress)
+
+    if args.apply and planner.options["overwrite_conflict"] and not args.overwrite:
+        parser.error("a opção de sobrescrita está ativada e arquivos existentes SERÃO PERDIDOS; use --overwrite para confirmar.")
+
+    with RenamePlan(track_sources=bool(args.import_path)) as plan:
+        if args.import_path:
+            try:
+                processed_count = planner.build_plan_from_file(plan, args.import_path)
+            except (OSError, ValueError, csv.Error) as e:
+                print(f"Erro ao importar o plano: {e}", file=sys.stderr)
+                return 1
+        else:
+            directory = planner.options["directory"]
+            if not directory or not os.path.isdir(directory):
+                parser.error(f"o diretório '{directory}' não existe ou não é válido.")
+            if not planner.options["output_pattern"].strip():
+                parser.error("o padrão de nome final não pode ser vazio (use --pattern).")
+            if not planner.custom_date_valid():
+                parser.error(f"a data '{planner.options['custom_date']}' não corresponde ao formato de entrada '{planner.options['date_input_format']}'.")
+            if not planner.has_transformation():
+                log("Nenhuma transformação especificada. Arquivos não serão alterados.")
+                return 0
+            if planner.options["remove_pattern"]:
+                if planner.remove_pattern_error is not None:
+                    print(f"Erro: padrão Regex inválido '{planner.options['remove_pattern']}': {planner.remove_pattern_error}.", file=sys.stderr)
+                    return 2
+                if planner.options["regex_time_budget"]:
+                    elapsed, sample_count = planner.probe_remove_pattern(directory)
+                    if elapsed is None:
+                        print(f"Erro: o padrão Regex '{planner.options['remove_pattern']}' excedeu o limite de "
+                              f"{planner.options['regex_time_budget']:.1f}s em {sample_count} nomes de amostra.", file=sys.stderr)
+                        return 2
+                    log(f"Regex avaliado em {elapsed * 1000:.1f} ms para {sample_count} nomes de amostra.")
+            recursive = planner.options["recursive"]
+            processed_count = planner.build_plan(plan, directory, settings.scan_count(directory, recursive))
+            settings.set_scan_count(directory, recursive, processed_count)
+
+        if args.export:
             try:
-                with open(SETTINGS_FILE, 'r') as f:
-                    return json.load(f)
-            except json.JSONDecodeError:
-                return {}
-        return {}
+                log(f"Plano exportado para '{args.export}' ({export_plan(plan, args.export)} entradas).")
+            except OSError as e:
+                print(f"Erro ao exportar o plano: {e}", file=sys.stderr)
+                return 1
+
+        renamed_count = planner.execute_plan(plan, preview=not args.apply)
+
+    if args.apply:
+        log(f"Renomeação concluída. Total de arquivos renomeados: {renamed_count} de {processed_count} processados.")
+    else:
+        log(f"Prévia concluída. Total de arquivos que seriam afetados: {len(plan)} de {processed_count} processados.")
+    return 0
 
-    def save_settings(self, settings):
-        with open(SETTINGS_FILE, 'w') as f:
-            json.dump(settings, f, indent=4)
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    if len(sys.argv) > 1 and sys.argv[1] == "--cli":
+        sys.exit(run_cli(sys.argv[2:]))
+    setup_file_logging()
     root = tk.Tk()
     app = FileRenamerApp(root)
     root.mainloop()
\ No newline at end of file
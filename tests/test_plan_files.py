@@ -0,0 +1,97 @@
+import json
+
+import pytest
+
+from renomeador_gui import MemoryFileSystem, RenamePlan, RenamePlanner, export_plan, iter_plan_file
+
+
+def build_plan(fs, options):
+    planner = RenamePlanner(dict({"output_pattern": "{original_name}{ext}"}, **options), fs=fs, log=lambda message: None)
+    plan = RenamePlan()
+    planner.build_plan(plan, "/d")
+    return plan
+
+
+def import_plan(fs, path, options=None):
+    logs = []
+    planner = RenamePlanner(dict({"output_pattern": "{original_name}{ext}"}, **(options or {})), fs=fs, log=logs.append)
+    plan = RenamePlan(track_sources=True)
+    row_count = planner.build_plan_from_file(plan, str(path))
+    return planner, plan, row_count, logs
+
+
+def entries(plan):
+    return [(root, old_name, new_name, conflict, action) for root, old_name, new_name, conflict, action in plan]
+
+
+def write_rows(path, rows):
+    if path.suffix == ".csv":
+        lines = [",".join(rows[0])] + [",".join(row.values()) for row in rows]
+        path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    elif path.suffix == ".json":
+        path.write_text(json.dumps(rows), encoding="utf-8")
+    else:
+        path.write_text("".join(json.dumps(row) + "\n" for row in rows), encoding="utf-8")
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".jsonl", ".json"])
+def test_round_trip(tmp_path, suffix):
+    fs = MemoryFileSystem(["/d/a1.txt", "/d/a2.txt", "/d/b,c.txt", "/d/ç \"d\".txt"])
+    with build_plan(fs, {"output_pattern": "novo_{original_name}{ext}"}) as plan:
+        expected = entries(plan)
+        assert export_plan(plan, str(tmp_path / f"plano{suffix}")) == len(expected) == 4
+
+    planner, imported, row_count, logs = import_plan(fs, tmp_path / f"plano{suffix}")
+    assert row_count == 4
+    assert [(old_name, new_name) for _, old_name, new_name, _, _ in imported] == [
+        (old_name, new_name) for _, old_name, new_name, _, _ in expected
+    ]
+    assert not any("Ignorando" in line for line in logs)
+    assert planner.execute_plan(imported) == 4
+    assert sorted(fs.listdir("/d")) == sorted(new_name for _, _, new_name, _, _ in expected)
+
+
+def test_json_array_is_streamed_across_chunk_boundaries(tmp_path, monkeypatch):
+    monkeypatch.setattr("renomeador_gui.PLAN_READ_CHUNK", 5)
+    rows = [{"old_path": f"/d/ação {i}.txt", "new_path": f"/d/novo {i}.txt"} for i in range(20)]
+    path = tmp_path / "plano.json"
+    path.write_text(json.dumps(rows, indent=2, ensure_ascii=False), encoding="utf-8")
+    assert list(iter_plan_file(str(path))) == [(row["old_path"], row["new_path"]) for row in rows]
+
+
+@pytest.mark.parametrize("text", ["[", '[{"old_path": "/d/a", "new_path": "/d/b"},]', '[{"old_path": "/d/a", "new_path": "/d/b"}] x', '{"old_path": "/d/a", "new_path": "/d/b"'])
+def test_malformed_json_plan_is_rejected(tmp_path, text):
+    path = tmp_path / "plano.json"
+    path.write_text(text, encoding="utf-8")
+    with pytest.raises(ValueError):
+        list(iter_plan_file(str(path)))
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".jsonl", ".json"])
+def test_duplicate_source_is_rejected(tmp_path, suffix):
+    fs = MemoryFileSystem(["/d/a.txt"])
+    path = tmp_path / f"plano{suffix}"
+    write_rows(path, [{"old_path": "/d/a.txt", "new_path": "/d/b.txt"}, {"old_path": "/d/./a.txt", "new_path": "/d/c.txt"}])
+    _, plan, row_count, logs = import_plan(fs, path)
+    assert row_count == 2
+    assert [(old_name, new_name) for _, old_name, new_name, _, _ in plan] == [("a.txt", "b.txt")]
+    assert any("aparece mais de uma vez" in line for line in logs)
+
+
+def test_other_directory_and_missing_source_are_skipped(tmp_path):
+    fs = MemoryFileSystem(["/d/a.txt", "/e/placeholder.txt"])
+    path = tmp_path / "plano.jsonl"
+    write_rows(path, [{"old_path": "/d/a.txt", "new_path": "/e/a.txt"}, {"old_path": "/d/sumiu.txt", "new_path": "/d/b.txt"}])
+    _, plan, row_count, logs = import_plan(fs, path)
+    assert row_count == 2
+    assert not len(plan)
+    assert any("está em outro diretório" in line for line in logs)
+    assert any("arquivo de origem não encontrado" in line for line in logs)
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".jsonl", ".json"])
+def test_missing_column_is_rejected(tmp_path, suffix):
+    path = tmp_path / f"plano{suffix}"
+    write_rows(path, [{"old_path": "/d/a.txt", "destino": "/d/b.txt"}])
+    with pytest.raises(ValueError):
+        import_plan(MemoryFileSystem(["/d/a.txt"]), path)
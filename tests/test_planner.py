@@ -0,0 +1,232 @@
+import errno
+import os
+import time
+
+import pytest
+
+from renomeador_gui import MemoryFileSystem, LocalFileSystem, RenamePlan, RenamePlanner, fold_case, probe_regex
+
+
+def plan_directory(fs, options, directory="/d", spill_threshold=None):
+    options = dict({"output_pattern": "{original_name}{ext}"}, **options)
+    logs = []
+    planner = RenamePlanner(options, fs=fs, log=logs.append)
+    plan = RenamePlan() if spill_threshold is None else RenamePlan(spill_threshold=spill_threshold)
+    planner.build_plan(plan, directory)
+    return planner, plan, logs
+
+
+def entries(plan):
+    return [(old_name, new_name, conflict, action) for _, old_name, new_name, conflict, action in plan]
+
+
+@pytest.fixture(params=[None, 0], ids=["memory", "spilled"])
+def spill_threshold(request):
+    return request.param
+
+
+def test_plain_rename(spill_threshold):
+    fs = MemoryFileSystem(["/d/a.txt", "/d/b.txt"])
+    planner, plan, _ = plan_directory(fs, {"output_pattern": "x_{original_name}{ext}"}, spill_threshold=spill_threshold)
+    assert entries(plan) == [("a.txt", "x_a.txt", "", "renomear"), ("b.txt", "x_b.txt", "", "renomear")]
+    assert planner.execute_plan(plan) == 2
+    assert sorted(fs.listdir("/d")) == ["x_a.txt", "x_b.txt"]
+
+
+def test_internal_conflict_is_incremented(spill_threshold):
+    fs = MemoryFileSystem(["/d/a1.txt", "/d/a2.txt"])
+    _, plan, logs = plan_directory(fs, {"remove_pattern": r"\d"}, spill_threshold=spill_threshold)
+    assert entries(plan) == [("a1.txt", "a.txt", "", "renomear"), ("a2.txt", "a (1).txt", "interno", "incrementar")]
+    assert any("Conflito INTERNO" in line for line in logs)
+
+
+def test_existing_file_conflict_is_incremented(spill_threshold):
+    fs = MemoryFileSystem(["/d/a.txt", "/d/x.txt", "/d/x (1).txt"])
+    _, plan, logs = plan_directory(fs, {"output_pattern": "x{ext}"}, spill_threshold=spill_threshold)
+    assert entries(plan) == [("a.txt", "x (2).txt", "existente", "incrementar"),
+                             ("x (1).txt", "x (3).txt", "existente", "incrementar")]
+    assert any("ARQUIVO EXISTENTE" in line for line in logs)
+
+
+def test_conflict_without_resolution_is_skipped():
+    fs = MemoryFileSystem(["/d/a.txt", "/d/x.txt"])
+    _, plan, logs = plan_directory(fs, {"output_pattern": "x{ext}", "add_increment_on_conflict": False})
+    assert entries(plan) == []
+    assert any("Sem opção de resolução" in line for line in logs)
+
+
+@pytest.mark.parametrize("rename_replaces", [True, False], ids=["posix", "windows"])
+def test_overwrite_replaces_existing_file(rename_replaces):
+    fs = MemoryFileSystem(["/d/a.txt", "/d/x.txt"], rename_replaces=rename_replaces)
+    planner, plan, _ = plan_directory(fs, {"output_pattern": "x{ext}", "overwrite_conflict": True})
+    assert entries(plan) == [("a.txt", "x.txt", "existente", "sobrescrever")]
+    assert planner.execute_plan(plan) == 1
+    assert fs.listdir("/d") == ["x.txt"]
+
+
+def test_windows_like_rename_refuses_existing_destination():
+    fs = MemoryFileSystem(["/d/a.txt", "/d/b.txt"], case_sensitive=False, rename_replaces=False)
+    with pytest.raises(FileExistsError):
+        fs.rename("/d/a.txt", "/d/B.TXT")
+    fs.rename("/d/a.txt", "/d/A.txt")
+    assert sorted(fs.listdir("/d")) == ["A.txt", "b.txt"]
+
+
+def test_case_only_rename_on_case_insensitive_filesystem(spill_threshold):
+    fs = MemoryFileSystem(["/d/IMG.JPG", "/d/b.jpg"], case_sensitive=False, rename_replaces=False)
+    planner, plan, _ = plan_directory(fs, {"case_option": "Minúsculas"}, spill_threshold=spill_threshold)
+    assert entries(plan) == [("IMG.JPG", "img.jpg", "", "renomear")]
+    assert planner.execute_plan(plan) == 1
+    assert sorted(fs.listdir("/d")) == ["b.jpg", "img.jpg"]
+
+
+def test_targets_differing_only_in_case_collide_on_case_insensitive_filesystem(spill_threshold):
+    fs = MemoryFileSystem(["/d/X1.jpg", "/d/x2.jpg"], case_sensitive=False)
+    _, plan, _ = plan_directory(fs, {"remove_pattern": r"\d", "case_option": "Minúsculas"}, spill_threshold=spill_threshold)
+    assert entries(plan) == [("X1.jpg", "x.jpg", "", "renomear"), ("x2.jpg", "x (1).jpg", "interno", "incrementar")]
+
+
+def test_case_sensitive_filesystem_keeps_case_variants_apart():
+    fs = MemoryFileSystem(["/d/IMG.JPG", "/d/img.jpg"])
+    _, plan, _ = plan_directory(fs, {"case_option": "Minúsculas"})
+    assert entries(plan) == [("IMG.JPG", "img (1).jpg", "existente", "incrementar")]
+
+
+def test_recursive_walk_plans_subdirectories():
+    fs = MemoryFileSystem(["/d/a.txt", "/d/sub/a.txt"])
+    _, plan, _ = plan_directory(fs, {"output_pattern": "x{ext}", "recursive": True})
+    assert [(root, new_name) for root, _, new_name, _, _ in plan] == [
+        (os.path.normpath("/d"), "x.txt"), (os.path.normpath("/d/sub"), "x.txt")]
+
+
+def test_fold_case_is_simple_per_character():
+    assert fold_case("Straße.txt") == fold_case("STRAßE.TXT")
+    assert fold_case("straße.txt") != fold_case("STRASSE.txt")
+    assert len(fold_case("ﬁle.txt")) == len("ﬁle.txt")
+
+
+def test_multi_character_case_mapping_is_not_a_self_collision(spill_threshold):
+    fs = MemoryFileSystem(["/d/straße.txt", "/d/STRASSE.txt"], case_sensitive=False, rename_replaces=False)
+    planner, plan, logs = plan_directory(fs, {"output_pattern": "STRASSE{ext}"}, spill_threshold=spill_threshold)
+    assert entries(plan) == [("straße.txt", "STRASSE (1).txt", "existente", "incrementar")]
+    assert any("ARQUIVO EXISTENTE" in line and "straße.txt" in line for line in logs)
+    assert planner.execute_plan(plan) == 1
+    assert sorted(fs.listdir("/d")) == ["STRASSE (1).txt", "STRASSE.txt"]
+
+
+def test_transformation_and_custom_date_checks():
+    assert not RenamePlanner({"output_pattern": " {original_name}{ext} "}).has_transformation()
+    assert RenamePlanner({"output_pattern": "{original_name}{ext}", "case_option": "Minúsculas"}).has_transformation()
+    assert RenamePlanner({"use_custom_date": True, "custom_date": "20240131"}).custom_date_valid()
+    assert not RenamePlanner({"use_custom_date": True, "custom_date": "2024-13-99"}, log=lambda message: None).custom_date_valid()
+
+
+def test_case_only_renames_need_no_extra_filesystem_calls(spill_threshold):
+    fs = MemoryFileSystem([f"/d/F{i}.JPG" for i in range(50)], case_sensitive=False)
+    planner, plan, _ = plan_directory(fs, {"case_option": "Minúsculas", "ignore_ext_case": False}, spill_threshold=spill_threshold)
+    assert len(plan) == 50
+    assert fs.operation_count == 1
+    assert planner.execute_plan(plan) == 50
+    assert fs.operation_count == 1 + 2 * 50
+    assert sorted(fs.listdir("/d")) == sorted(f"f{i}.JPG" for i in range(50))
+
+
+class FailingRenameFileSystem(MemoryFileSystem):
+    def __init__(self, *args, failing_calls=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.failing_calls = set(failing_calls)
+        self.rename_calls = 0
+
+    def rename(self, src, dst):
+        self.rename_calls += 1
+        if self.rename_calls in self.failing_calls:
+            raise PermissionError(errno.EACCES, "acesso negado", dst)
+        super().rename(src, dst)
+
+
+def test_failed_case_only_rename_is_rolled_back():
+    fs = FailingRenameFileSystem(["/d/A.txt"], case_sensitive=False, failing_calls=[2])
+    planner, plan, logs = plan_directory(fs, {"output_pattern": "a{ext}"})
+    assert planner.execute_plan(plan) == 0
+    assert fs.listdir("/d") == ["A.txt"]
+    assert any("Erro ao renomear 'A.txt' para 'a.txt'" in line for line in logs)
+
+
+def test_failed_rollback_reports_where_the_file_was_left():
+    fs = FailingRenameFileSystem(["/d/A.txt"], case_sensitive=False, failing_calls=[2, 3])
+    planner, plan, logs = plan_directory(fs, {"output_pattern": "a{ext}"})
+    assert planner.execute_plan(plan) == 0
+    [temp_name] = fs.listdir("/d")
+    assert temp_name.startswith("A.txt.") and temp_name.endswith(".namefluxer.tmp")
+    assert any("ao restaurar o nome original" in line and temp_name in line for line in logs)
+    assert any(line.startswith("Erro ao renomear 'A.txt' para 'a.txt': ") for line in logs)
+
+
+def test_invalid_remove_pattern_warns_once():
+    fs = MemoryFileSystem(["/d/a.txt"])
+    planner, plan, logs = plan_directory(fs, {"remove_pattern": "(", "output_pattern": "x{ext}"})
+    assert planner.remove_regex is None and planner.remove_pattern_error is not None
+    assert sum("Regex inválido" in line for line in logs) == 1
+    assert entries(plan) == [("a.txt", "x.txt", "", "renomear")]
+
+
+def test_probe_without_samples_is_skipped():
+    planner = RenamePlanner({"remove_pattern": r"\(.*?\)"}, fs=MemoryFileSystem())
+    assert planner.probe_remove_pattern("/nada") == (0.0, 0)
+
+
+def test_probe_is_skipped_when_budget_is_disabled():
+    planner = RenamePlanner({"remove_pattern": "(a+)+$", "regex_time_budget": 0.0}, fs=MemoryFileSystem(["/d/aaaa.txt"]))
+    assert planner.probe_remove_pattern("/d") == (0.0, 0)
+    assert planner.probe_remove_pattern("/d", 0) == (0.0, 0)
+
+
+def test_catastrophic_pattern_exceeds_budget():
+    planner = RenamePlanner({"remove_pattern": "(a+)+$", "regex_time_budget": 0.5}, fs=MemoryFileSystem(["/d/aaaa.txt"]))
+    start = time.monotonic()
+    elapsed, sample_count = planner.probe_remove_pattern("/d")
+    assert elapsed is None and sample_count > 0
+    assert time.monotonic() - start < 5
+
+
+def test_cheap_pattern_is_timed():
+    elapsed = probe_regex(r"\d+", ["foto 123.jpg"] * 100, 5)
+    assert elapsed is not None and 0 <= elapsed < 5
+
+
+def test_deep_tree_does_not_recurse():
+    depth = 3000
+    directory = "/d" + "/s" * depth
+    fs = MemoryFileSystem([os.path.join(directory, "a.txt")])
+    walked = list(fs.walk("/d"))
+    assert len(walked) == depth + 1
+    assert walked[-1] == (directory, [], ["a.txt"])
+    _, plan, _ = plan_directory(fs, {"output_pattern": "b{ext}", "recursive": True})
+    assert [(root, old_name, new_name) for root, old_name, new_name, _, _ in plan] == [(directory, "a.txt", "b.txt")]
+
+
+def test_memory_filesystem_matches_local_filesystem(tmp_path):
+    names = ["a1.txt", "a2.txt", "x.txt", "IMG.JPG", "sub/b.txt"]
+    for name in names:
+        path = tmp_path / name
+        path.parent.mkdir(exist_ok=True)
+        path.write_text("")
+    memory_fs = MemoryFileSystem([os.path.join("/d", name) for name in names],
+                                 case_sensitive=LocalFileSystem().is_case_sensitive(str(tmp_path), "IMG.JPG"))
+    options = {"output_pattern": "x{ext}", "remove_pattern": r"\d", "recursive": True}
+    _, local_plan, _ = plan_directory(LocalFileSystem(), options, directory=str(tmp_path))
+    _, memory_plan, _ = plan_directory(memory_fs, options)
+    assert len(local_plan) == len(memory_plan)
+    assert sorted(old_name for _, old_name, _, _, _ in local_plan) == sorted(old_name for _, old_name, _, _, _ in memory_plan)
+    assert sorted(new_name for _, _, new_name, _, _ in local_plan) == sorted(new_name for _, _, new_name, _, _ in memory_plan)
+
+
+def test_pathological_collisions_at_scale(monkeypatch):
+    monkeypatch.setattr("renomeador_gui.PLAN_SPILL_BATCH", 64)
+    fs = MemoryFileSystem([f"/d/F{i}.JPG" for i in range(400)], case_sensitive=False)
+    planner, plan, _ = plan_directory(fs, {"remove_pattern": r"\d", "case_option": "Minúsculas"}, spill_threshold=100)
+    assert plan.spilled
+    new_names = [new_name for _, _, new_name, _, _ in plan]
+    assert len(new_names) == 400
+    assert len({fold_case(name) for name in new_names}) == 400
+    assert planner.execute_plan(plan) == 400
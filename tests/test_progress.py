@@ -0,0 +1,79 @@
+import pytest
+
+from renomeador_gui import ProgressTracker, format_duration
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def advance(tracker, clock, seconds, per_second):
+    for _ in range(int(seconds * 8)):
+        clock.now += 0.125
+        tracker.tick(per_second // 8)
+
+
+def test_listeners_are_rate_limited_independently(clock):
+    tracker = ProgressTracker(clock=clock)
+    fast, slow = [], []
+    tracker.add_listener(lambda t: fast.append(clock.now), 0.25)
+    tracker.add_listener(lambda t: slow.append(clock.now), 5.0)
+    tracker.start_phase("Planejamento")
+    advance(tracker, clock, 10, 80)
+    assert slow == pytest.approx([0.0, 5.0, 10.0])
+    assert 35 <= len(fast) <= 41
+    assert all(b - a >= 0.25 - 1e-9 for a, b in zip(fast, fast[1:]))
+    tracker.finish_phase()
+    assert fast[-1] == slow[-1] == clock.now
+
+
+def test_rate_uses_a_rolling_window(clock):
+    tracker = ProgressTracker(clock=clock)
+    tracker.add_listener(lambda t: None, 0.25)
+    tracker.start_phase("Renomeação", total=10000)
+    advance(tracker, clock, 10, 400)
+    assert tracker.rate == pytest.approx(400, rel=0.1)
+    advance(tracker, clock, 10, 80)
+    assert tracker.rate == pytest.approx(80, rel=0.1)
+
+
+def test_fraction_and_eta(clock):
+    tracker = ProgressTracker(clock=clock)
+    tracker.add_listener(lambda t: None, 0.25)
+    tracker.start_phase("Renomeação", total=800)
+    assert tracker.fraction == 0.0 and tracker.eta is None
+    advance(tracker, clock, 5, 80)
+    assert tracker.fraction == pytest.approx(0.5)
+    assert tracker.eta == pytest.approx(5, rel=0.1)
+    assert "ETA 00:05" in tracker.status_line()
+    advance(tracker, clock, 6, 80)
+    assert tracker.fraction == 1.0
+    assert tracker.eta is None
+
+    tracker.start_phase("Planejamento")
+    tracker.tick(10)
+    assert tracker.fraction is None and tracker.eta is None
+    assert "ETA --:--" in tracker.status_line()
+
+
+def test_finish_phase_reports_final_totals(clock):
+    tracker = ProgressTracker(clock=clock)
+    reports = []
+    tracker.add_listener(lambda t: reports.append((t.phase_finished, t.status_line())), 60)
+    tracker.start_phase("Planejamento", total=500)
+    advance(tracker, clock, 4, 40)
+    tracker.finish_phase()
+    assert [finished for finished, _ in reports] == [False, True]
+    assert tracker.total == tracker.done == 160
+    assert tracker.rate == pytest.approx(40)
+    assert reports[-1][1].startswith("Planejamento: 160/160 (100.0%)")
+    assert reports[-1][1].endswith(f"concluído em {format_duration(4)}")
@@ -0,0 +1,163 @@
+import json
+import os
+import time
+
+import pytest
+
+from renomeador_gui import SETTINGS_FILE, SettingsStore, default_options
+
+
+@pytest.fixture
+def settings_path(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return str(tmp_path / "config" / SETTINGS_FILE)
+
+
+def read_json(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_validate_rejects_bad_values():
+    data = SettingsStore.validate({
+        "dont_show_welcome_again": 1,
+        "options": {
+            "case_option": "Invertido",
+            "start_num": 0,
+            "digits": -2,
+            "recursive": 1,
+            "sequential": True,
+            "regex_time_budget": 1,
+            "output_pattern": "{original_name}_x{ext}",
+        },
+        "presets": {"": {}, "  ": {}, "fotos": {"start_num": True, "space_option": "Remover Todos"}, "lista": []},
+        "active_preset": "inexistente",
+    })
+    defaults = default_options()
+    options = data["options"]
+    assert options["case_option"] == defaults["case_option"]
+    assert options["start_num"] == defaults["start_num"]
+    assert options["digits"] == defaults["digits"]
+    assert options["recursive"] is False
+    assert options["sequential"] is True
+    assert options["regex_time_budget"] == 1.0 and type(options["regex_time_budget"]) is float
+    assert options["output_pattern"] == "{original_name}_x{ext}"
+    assert data["dont_show_welcome_again"] is False
+    assert sorted(data["presets"]) == ["fotos", "lista"]
+    assert data["presets"]["fotos"]["start_num"] == defaults["start_num"]
+    assert data["presets"]["fotos"]["space_option"] == "Remover Todos"
+    assert data["presets"]["lista"] == defaults
+    assert data["active_preset"] == ""
+
+
+def test_changes_are_debounced_into_one_write(settings_path, monkeypatch):
+    store = SettingsStore(settings_path, save_delay=0.05)
+    writes = []
+    write_atomic = store._write_atomic
+    monkeypatch.setattr(store, "_write_atomic", lambda payload: (writes.append(payload), write_atomic(payload)))
+    for start_num in range(2, 7):
+        store.update_options(dict(store.options, start_num=start_num))
+    assert not os.path.exists(settings_path)
+    deadline = time.monotonic() + 5
+    while not writes and time.monotonic() < deadline:
+        time.sleep(0.01)
+    time.sleep(0.1)
+    assert len(writes) == 1
+    assert read_json(settings_path)["options"]["start_num"] == 6
+
+
+def test_flush_writes_pending_changes_immediately(settings_path):
+    store = SettingsStore(settings_path, save_delay=60)
+    store.set("dont_show_welcome_again", True)
+    assert store.flush()
+    assert read_json(settings_path)["dont_show_welcome_again"] is True
+    assert SettingsStore(settings_path).get("dont_show_welcome_again") is True
+
+
+def test_atomic_write_leaves_no_temp_file(settings_path, monkeypatch):
+    store = SettingsStore(settings_path, save_delay=60)
+    store.update_options(dict(store.options, digits=5))
+    assert store.flush()
+    assert os.listdir(os.path.dirname(settings_path)) == [SETTINGS_FILE]
+
+    def failing_replace(src, dst):
+        raise OSError("disco cheio")
+
+    monkeypatch.setattr(os, "replace", failing_replace)
+    store.update_options(dict(store.options, digits=6))
+    assert not store.flush()
+    assert os.listdir(os.path.dirname(settings_path)) == [SETTINGS_FILE]
+    assert read_json(settings_path)["options"]["digits"] == 5
+
+
+def test_legacy_working_directory_file_is_used(settings_path):
+    with open(SETTINGS_FILE, "w", encoding="utf-8") as f:
+        json.dump({"options": {"output_pattern": "legado{ext}"}}, f)
+    store = SettingsStore(settings_path)
+    assert store.options["output_pattern"] == "legado{ext}"
+    assert store.load_error is None
+
+
+def test_presets_and_active_preset(settings_path):
+    store = SettingsStore(settings_path, save_delay=60)
+    store.save_preset("Fotos", dict(default_options(), output_pattern="Foto_{sequence}{ext}"))
+    store.save_preset("arquivos", default_options())
+    assert store.preset_names() == ["arquivos", "Fotos"]
+    assert store.get("active_preset") == "arquivos"
+    store.set("active_preset", "Fotos")
+    assert store.preset("Fotos")["output_pattern"] == "Foto_{sequence}{ext}"
+    assert not store.delete_preset("inexistente")
+    assert store.delete_preset("Fotos")
+    assert store.get("active_preset") == ""
+    assert store.flush()
+    reloaded = SettingsStore(settings_path)
+    assert reloaded.preset_names() == ["arquivos"]
+    assert reloaded.get("active_preset") == ""
+
+
+def test_corrupt_file_is_moved_aside(settings_path):
+    os.makedirs(os.path.dirname(settings_path))
+    with open(settings_path, "w", encoding="utf-8") as f:
+        f.write('{"presets": {"Fotos": ')
+    store = SettingsStore(settings_path, save_delay=60)
+    assert store.load_error and ".corrupt" in store.load_error
+    assert store.options == dict(default_options(), custom_date=store.options["custom_date"])
+    backups = [name for name in os.listdir(os.path.dirname(settings_path)) if name.endswith(".corrupt")]
+    assert len(backups) == 1
+    store.update_options(dict(store.options, digits=4))
+    assert store.flush()
+    with open(os.path.join(os.path.dirname(settings_path), backups[0]), encoding="utf-8") as f:
+        assert f.read() == '{"presets": {"Fotos": '
+
+
+def test_unmovable_corrupt_file_is_never_overwritten(settings_path, monkeypatch):
+    os.makedirs(os.path.dirname(settings_path))
+    with open(settings_path, "w", encoding="utf-8") as f:
+        f.write("[]")
+
+    def failing_replace(src, dst):
+        raise PermissionError("acesso negado")
+
+    monkeypatch.setattr(os, "replace", failing_replace)
+    store = SettingsStore(settings_path, save_delay=60)
+    assert store.save_blocked and store.load_error
+    store.update_options(dict(store.options, digits=4))
+    assert not store.flush()
+    with open(settings_path, encoding="utf-8") as f:
+        assert f.read() == "[]"
+
+
+def test_scan_counts_are_remembered_per_directory(settings_path, monkeypatch):
+    monkeypatch.setattr("renomeador_gui.SCAN_COUNT_HISTORY", 3)
+    store = SettingsStore(settings_path, save_delay=60)
+    assert store.scan_count("/fotos", True) is None
+    for index in range(5):
+        store.set_scan_count(f"/pasta{index}", False, index + 1)
+    store.set_scan_count("/fotos", True, 1200)
+    assert store.scan_count("/fotos", True) == 1200
+    assert store.scan_count("/fotos", False) is None
+    assert store.scan_count("/pasta4", False) == 5
+    assert store.scan_count("/pasta2", False) is None
+    assert store.flush()
+    assert SettingsStore(settings_path).scan_count("/fotos", True) == 1200
+    assert SettingsStore.validate({"scan_counts": {"N|/a": 0, "N|/b": True, "N|/c": 7}})["scan_counts"] == {"N|/c": 7}